@@ -5,6 +5,7 @@ import { useNavigate, useParams } from "react-router-dom"
 import { Search, Upload, MoreHorizontal, FileText, FolderOpen, Loader2 } from "lucide-react"
 import { useUser } from "@clerk/clerk-react"
 import useSWR from "swr"
+import useSWRInfinite from "swr/infinite"
 import useSWRMutation from "swr/mutation"
 
 import { Button } from "@/components/ui/button"
@@ -117,13 +118,24 @@ export default function CategoryPage() {
     error: categoriesError
   } = useSWR(shouldFetch ? '/api/categories' : null, fetcher)
   
-  // Fetch resumes for the current category
+  // Fetch resumes for the current category, one page at a time
+  const getResumesKey = (pageIndex: number, previousPage: any) => {
+    if (!shouldFetch) return null
+    if (pageIndex === 0) return `/api/categories/${categoryId}/resumes`
+    if (!previousPage?.nextCursor) return null
+    return `/api/categories/${categoryId}/resumes?cursor=${encodeURIComponent(previousPage.nextCursor)}`
+  }
+
   const {
-    data: resumesData,
+    data: resumesPages,
     error: resumesError,
     isLoading,
+    isValidating: isLoadingMore,
+    size: resumePageCount,
+    setSize: setResumePageCount,
     mutate: mutateResumes
-  } = useSWR(shouldFetch ? `/api/categories/${categoryId}/resumes` : null, fetcher)
+  } = useSWRInfinite(getResumesKey, fetcher)
+  const hasMoreResumes = !!resumesPages?.[resumesPages.length - 1]?.nextCursor
   
   // Mutations
   const { trigger: deleteResume, isMutating: isDeleting } = useSWRMutation('/api/resumes', deleteResumeFetcher, {
@@ -160,13 +172,13 @@ export default function CategoryPage() {
     ? (categoriesData?.categories || []).concat({ id: "all", name: "All" }) 
     : [{ id: "all", name: "All" }]
     
-  const formattedResumes: Resume[] = shouldFetch && resumesData?.resumes
-    ? resumesData.resumes.map((resume: any) => ({
+  const formattedResumes: Resume[] = shouldFetch && resumesPages
+    ? resumesPages.flatMap((page: any) => page.resumes || []).map((resume: any) => ({
         id: resume.id,
         name: resume.name,
         categoryId: resume.category_id,
         uploadDate: new Date(resume.date).toISOString().split('T')[0],
-        fileSize: "", // Placeholder for file size
+        fileSize: resume.byte_size ? `${(resume.byte_size / 1024).toFixed(0)} KB` : "",
         link: resume.link
       }))
     : []
@@ -340,6 +352,14 @@ export default function CategoryPage() {
             ))}
             </div>
           )}
+          {!isFetchLoading && !error && hasMoreResumes && (
+            <div className="flex justify-center py-4">
+              <Button variant="outline" disabled={isLoadingMore} onClick={() => setResumePageCount(resumePageCount + 1)}>
+                {isLoadingMore && <Loader2 className="h-4 w-4 mr-2 animate-spin" />}
+                Load more
+              </Button>
+            </div>
+          )}
         </ScrollArea>
       </main>
 
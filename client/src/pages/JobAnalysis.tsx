@@ -39,13 +39,23 @@ export default function JobAnalysis() {
 
     const fetchResumes = async () => {
       try {
-        const res = await fetch("/api/get-user-resume-names");
-        const data = await res.json();
-        if (res.ok) {
-          setResumes(data.resumes);
-        } else {
-          console.error("Error:", data.error);
-        }
+        // The endpoint is paginated, so follow nextCursor until every resume is loaded
+        let all: Resume[] = [];
+        let cursor: string | null = null;
+        do {
+          const url: string = cursor
+            ? `/api/get-user-resume-names?cursor=${encodeURIComponent(cursor)}`
+            : "/api/get-user-resume-names";
+          const res = await fetch(url);
+          const data = await res.json();
+          if (!res.ok) {
+            console.error("Error:", data.error);
+            return;
+          }
+          all = all.concat(data.resumes);
+          cursor = data.nextCursor;
+        } while (cursor);
+        setResumes(all);
       } catch (err) {
         console.error("Failed to fetch resumes:", err);
       }
@@ -0,0 +1,5 @@
+-- Store text extracted from each resume PDF at upload time
+ALTER TABLE resumes
+    ADD COLUMN text_content TEXT NULL, -- Plain text extracted from the PDF (NULL until extracted)
+    ADD COLUMN page_count INT NULL, -- Number of pages in the PDF
+    ADD COLUMN byte_size INT NULL; -- Size of the PDF in bytes
\ No newline at end of file
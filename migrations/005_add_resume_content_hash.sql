@@ -0,0 +1,5 @@
+-- Content-address resume files so identical uploads share one storage object
+ALTER TABLE resumes
+    ADD COLUMN content_hash CHAR(64) NULL; -- SHA-256 of the PDF bytes, the storage object is named <content_hash>.pdf (NULL for older rows)
+
+CREATE INDEX resumes_content_hash_idx ON resumes (content_hash); -- Dedup lookups and reference counts on delete
\ No newline at end of file
@@ -0,0 +1,27 @@
+-- Categories with their resume counts, plus the uncategorized and overall totals, in one call
+CREATE OR REPLACE FUNCTION get_categories_with_counts(p_clerk_id VARCHAR)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT json_build_object(
+        'categories', COALESCE((
+            SELECT json_agg(row_to_json(counted) ORDER BY counted.id)
+            FROM (
+                SELECT categories.*, COUNT(resumes.id) AS "resumeCount"
+                FROM categories
+                LEFT JOIN resumes
+                    ON resumes.category_id = categories.id
+                    AND resumes.clerk_id = p_clerk_id
+                WHERE categories.clerk_id = p_clerk_id
+                GROUP BY categories.id
+            ) AS counted
+        ), '[]'::json), -- Every category owned by the user, each with a resumeCount
+        'uncategorized', (
+            SELECT COUNT(*) FROM resumes WHERE clerk_id = p_clerk_id AND category_id IS NULL
+        ), -- Resumes without a category
+        'total', (
+            SELECT COUNT(*) FROM resumes WHERE clerk_id = p_clerk_id
+        ) -- All of the user's resumes (the "All" category)
+    );
+$$;
@@ -0,0 +1,3 @@
+-- Keyset pagination indexes: resume listings are ordered by (date, id) newest first and filtered per user
+CREATE INDEX resumes_clerk_category_date_idx ON resumes (clerk_id, category_id, date DESC, id DESC); -- Pages of one category
+CREATE INDEX resumes_clerk_date_idx ON resumes (clerk_id, date DESC, id DESC); -- Pages of the "All" category and the resume names list
\ No newline at end of file
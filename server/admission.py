@@ -0,0 +1,94 @@
+import math
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# `rate` requests per second refilling a bucket of `burst`, at most `concurrency` in flight; 0 turns either off
+# (a rate with no burst could never admit anything, so burst 0 turns the rate limit off too)
+Limit = namedtuple('Limit', ['rate', 'burst', 'concurrency'])
+
+# Retry hint when a user is at the concurrency limit; there's no telling when a slot frees up
+CONCURRENCY_RETRY_AFTER = 1
+
+class AdmissionDenied(Exception):
+    """Raised by AdmissionControl.acquire() for a request that is over its user's limit."""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Over the {reason} limit, retry in {retry_after}s")
+        self.reason = reason  # 'rate' or 'concurrency'
+        self.retry_after = retry_after  # whole seconds, for a Retry-After header
+
+class AdmissionControl:
+    """Per-user token buckets and in-flight limits for the expensive routes.
+
+    Each route class ('analyze', 'upload', ...) has its own Limit, applied to
+    every user separately. A request over either limit is refused at once with
+    a retry hint rather than queued, so one user can't take every worker or the
+    LLM quota from the others. State for the least recently seen users is
+    dropped beyond `max_users`.
+    """
+
+    def __init__(self, limits, max_users=10000):
+        self.limits = limits
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._states = OrderedDict()  # (route, user_id) -> [tokens, refilled at, in flight]
+        self.stats = {route: {'admitted': 0, 'rejected_rate': 0, 'rejected_concurrency': 0, 'in_flight': 0}
+                      for route in limits}
+
+    def acquire(self, route, user_id):
+        """Take a slot for one `route` request by `user_id`, raising AdmissionDenied if over a limit.
+
+        Every successful acquire() must be paired with a release().
+        """
+        limit = self.limits[route]
+        stats = self.stats[route]
+        now = time.monotonic()
+        with self._lock:
+            key = (route, user_id)
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = [float(limit.burst), now, 0]
+                self._evict()
+            else:
+                self._states.move_to_end(key)
+
+            if limit.concurrency and state[2] >= limit.concurrency:
+                stats['rejected_concurrency'] += 1
+                raise AdmissionDenied('concurrency', CONCURRENCY_RETRY_AFTER)
+            if limit.rate and limit.burst > 0:
+                tokens = min(float(limit.burst), state[0] + (now - state[1]) * limit.rate)
+                state[1] = now
+                if tokens < 1:
+                    state[0] = tokens
+                    stats['rejected_rate'] += 1
+                    raise AdmissionDenied('rate', max(1, math.ceil((1 - tokens) / limit.rate)))
+                state[0] = tokens - 1
+
+            state[2] += 1
+            stats['admitted'] += 1
+            stats['in_flight'] += 1
+
+    def release(self, route, user_id):
+        with self._lock:
+            state = self._states.get((route, user_id))
+            if state is not None and state[2] > 0:
+                state[2] -= 1
+            self.stats[route]['in_flight'] -= 1
+
+    def _evict(self):
+        # Users with requests in flight are kept, their counts are still needed
+        for _ in range(len(self._states)):
+            if len(self._states) <= self.max_users:
+                break
+            key, state = next(iter(self._states.items()))
+            if state[2]:
+                self._states.move_to_end(key)
+            else:
+                del self._states[key]
+
+    def snapshot(self):
+        with self._lock:
+            flat = {f"{route}_{stat}": value for route, stats in self.stats.items() for stat, value in stats.items()}
+            flat['users'] = len(self._states)
+        return flat
@@ -0,0 +1,63 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+
+class LoopThread:
+    """One asyncio event loop for the whole process, running in a daemon thread.
+
+    Async views and the async Supabase/LLM clients all live on this loop, so
+    the clients' connection pools are shared by every request instead of being
+    tied to a loop that only exists for one request. run() is called from the
+    request threads.
+    """
+
+    def __init__(self, name='aio-loop'):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coro):
+        """Run `coro` on the loop and block until it finishes, returning its result or raising its error.
+
+        The coroutine runs in a copy of the caller's context, so Flask's request
+        and the request's timings (metrics.py) are visible inside it.
+        """
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("LoopThread.run() called from the loop itself, await the coroutine instead")
+        context = contextvars.copy_context()
+        future = concurrent.futures.Future()
+
+        def start():
+            task = self.loop.create_task(coro, context=context)
+
+            def finish(task):
+                if task.cancelled():
+                    future.cancel()
+                elif task.exception() is not None:
+                    future.set_exception(task.exception())
+                else:
+                    future.set_result(task.result())
+            task.add_done_callback(finish)
+
+        self.loop.call_soon_threadsafe(start)
+        return future.result()
+
+_loop_thread = None
+_loop_thread_lock = threading.Lock()
+
+def getLoopThread():
+    global _loop_thread
+    if _loop_thread is None:
+        with _loop_thread_lock:
+            if _loop_thread is None:
+                _loop_thread = LoopThread()
+    return _loop_thread
+
+def runAsync(coro):
+    return getLoopThread().run(coro)
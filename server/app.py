@@ -1,27 +1,92 @@
-from flask import Flask, request, send_from_directory
+from flask import Flask, Blueprint, current_app, request, send_from_directory, Response, stream_with_context, g, abort
+import asyncio
+import functools
+import inspect
+import json
 import os
+import threading
 import warnings
 import sys
+import time
 from dotenv import load_dotenv
-from supabase import create_client, Client
-from clerk_backend_api import Clerk
-from clerk_backend_api.jwks_helpers import AuthenticateRequestOptions
 from flask_cors import CORS
-from io import BufferedReader
+from werkzeug.exceptions import RequestEntityTooLarge
 
-# Import supabase instance along with other db functions
+# Once, before the modules below read their settings from the environment
+load_dotenv()
+
+# Import db functions; the data client itself is created on first use
 from database import (
-    MockSupabaseResponse, supabase, createUser, deleteUser, getUsers, uploadFile,
-    getCategories, getResumesByCategory, getResumesCount, 
-    createCategory, updateCategory, deleteCategory, getResumesForUser,
+    MockSupabaseResponse, getSupabase, createUser, deleteUser, getUsers, uploadFile,
+    createCategory, updateCategory, deleteCategory,
     updateUserInDB, getResumeByIdAndUser, deleteResumeFileFromStorage,
-    deleteResumeFromDB, getCategoryByIdAndUser, moveResumeToCategoryInDB
+    deleteResumeFromDB, getCategoryByIdAndUser,
+    getResumeTextByLink, releaseResumeFile, getResumeTextsForUser,
+    userCache, RESUME_PAGE_SIZE, getResumesByIdsAndUser, deleteResumesFromDB,
+    moveResumesToCategoryInDB, releaseResumeFiles, uploadFiles, DATA_BACKEND,
+    getCategoriesWithCountsAsync, getResumesPageAsync, getResumeByIdAndUserAsync, getCategoryByIdAndUserAsync,
+    moveResumeToCategoryInDBAsync, getResumeTextByLinkAsync, getResumeTextsForUserAsync
 )
 
-from jobmatch import compareResumeJobDesc, readPdf
-
-UPLOAD_FOLDER = '/tmp/uploads'
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+from jobmatch import (
+    compareResumeJobDesc, readPdf, keywordRank, matchCache, textCache, blobMirror,
+    streamResumeJobDesc, compareResumeJobDescAsync, rankResumesAsync
+)
+from llmclient import CircuitOpenError
+from jobqueue import JobQueue, JobStore, QueueFullError
+from auth import getVerifier
+from uploads import UploadRequest, MAX_UPLOAD_BYTES
+from metrics import registry, startRequest, finishRequest, timed
+from pdfextract import getPdfExtractor
+from staticfiles import StaticManifest
+from admission import AdmissionControl, AdmissionDenied, Limit
+from aio import runAsync
+
+# Upper bound on concurrent LLM calls for a single ranking request
+RANK_MAX_WORKERS = int(os.getenv('RANK_MAX_WORKERS') or 8)
+# Only this many of the best keyword matches are sent to the LLM when ranking
+RANK_SHORTLIST = int(os.getenv('RANK_SHORTLIST') or 5)
+# Most resume ids accepted by one bulk move/delete request
+MAX_BULK_RESUMES = 500
+# Batch uploads: most files per request and concurrent storage uploads
+MAX_BATCH_FILES = int(os.getenv('MAX_BATCH_FILES') or 50)
+UPLOAD_MAX_WORKERS = int(os.getenv('UPLOAD_MAX_WORKERS') or 4)
+# Per-phase timings on every response, set SERVER_TIMING=0 to keep them out of responses
+SERVER_TIMING = (os.getenv('SERVER_TIMING') or '1') != '0'
+# Serve the built client from a manifest made at startup, set STATIC_MANIFEST=0 to look files up per request
+STATIC_MANIFEST = (os.getenv('STATIC_MANIFEST') or '1') != '0'
+
+# Per-user limits on the routes that cost an LLM call or a storage upload, see admission.py.
+# Rates are requests per second; setting a rate or concurrency to 0 turns that limit off.
+admission = AdmissionControl({
+    'analyze': Limit(
+        rate=float(os.getenv('ANALYZE_RATE') or 0.2),
+        burst=int(os.getenv('ANALYZE_BURST') or 10),
+        concurrency=int(os.getenv('ANALYZE_CONCURRENCY') or 3)
+    ),
+    'upload': Limit(
+        rate=float(os.getenv('UPLOAD_RATE') or 1),
+        burst=int(os.getenv('UPLOAD_BURST') or 30),
+        concurrency=int(os.getenv('UPLOAD_CONCURRENCY') or 4)
+    )
+}, max_users=int(os.getenv('ADMISSION_MAX_USERS') or 10000))
+
+# Job analyses run on a bounded in-process worker pool, job state lives in SQLite.
+# Created with the first job rather than at import, like the other process-wide clients.
+_analysis_queue = None
+_analysis_queue_lock = threading.Lock()
+
+def getAnalysisQueue():
+    global _analysis_queue
+    if _analysis_queue is None:
+        with _analysis_queue_lock:
+            if _analysis_queue is None:
+                _analysis_queue = JobQueue(
+                    JobStore(os.getenv('JOB_DB') or '/tmp/resumevc/jobs.sqlite3'),
+                    workers=int(os.getenv('ANALYSIS_WORKERS') or 4),
+                    max_pending=int(os.getenv('ANALYSIS_QUEUE_SIZE') or 32)
+                )
+    return _analysis_queue
 
 # Suppress specific warning from Clerk SDK
 warnings.filterwarnings(
@@ -29,39 +94,179 @@ warnings.filterwarnings(
     message='authenticate_request method is applicable in the context of Backend APIs only.'
 )
 
-app = Flask(__name__, static_folder="../client/dist", static_url_path="")
-
-CORS(app)
+class AsyncFlask(Flask):
+    """Flask whose `async def` views run on the process-wide event loop in aio.py.
+
+    Stock Flask runs each coroutine view in an event loop of its own, which
+    the shared async Supabase and LLM clients can't outlive. Here the request
+    thread hands the coroutine to the one loop and waits for its response, so
+    the I/O of every in-flight request overlaps on the same connection pools.
+    """
+
+    def ensure_sync(self, func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            def run(*args, **kwargs):
+                # Read and parse the body here, on the request thread: a slow client
+                # mustn't hold up the loop every other request is running on
+                if request.is_json:
+                    request.get_json(silent=True)
+                return runAsync(func(*args, **kwargs))
+            return run
+        return func
+
+# Every route lives on this blueprint, create_app() below builds the app around it
+routes = Blueprint('routes', __name__)
+
+def create_app():
+    """Build the Flask app.
+
+    Nothing here talks to Supabase, Clerk or the LLM: those clients (and their
+    SDK imports) are created on first use, so a worker can boot and pass a
+    health check without them.
+    """
+    # The built client is served by serve_static_files below rather than Flask's own static route,
+    # which would otherwise answer every path first and 404 client-side routes
+    app = AsyncFlask(__name__, static_folder=None)
+    app.static_folder = "../client/dist"
+    # Uploaded files are hashed and validated while they are parsed, see uploads.py
+    app.request_class = UploadRequest
+
+    CORS(app)
+    app.register_blueprint(routes)
+    loadStaticFiles(app)
+    return app
+
+# Request timing: phases are timed in auth/database.py/jobmatch.py, see metrics.py
+@routes.before_app_request
+def start_request_timing():
+    g.timing, g.timing_token = startRequest()
+
+@routes.after_app_request
+def add_server_timing(response):
+    timing = g.get('timing')
+    if timing is None:
+        return response
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    registry.histogram(
+        'resumevc_request_seconds', 'Time to produce a response, by route and status',
+        method=request.method, endpoint=endpoint, status=str(response.status_code)
+    ).observe(time.perf_counter() - timing.started)
+    if SERVER_TIMING:
+        response.headers['Server-Timing'] = timing.serverTiming()
+    return response
+
+@routes.teardown_app_request
+def finish_request_timing(error=None):
+    token = g.pop('timing_token', None)
+    if token is not None:
+        try:
+            finishRequest(token)
+        except ValueError:
+            # Streamed responses can finish in a different context, nothing left to reset then
+            pass
+
+# Admission slots are held until the request is done, which for a stream is when it has been sent
+# and for a queued analysis job is when the job finishes
+@routes.teardown_app_request
+def release_admission(error=None):
+    admitted = g.pop('admitted', None)
+    if admitted is not None:
+        admission.release(*admitted)
+
+def admit(user_id, route):
+    """None if this request may go ahead, otherwise the 429 response to send instead."""
+    try:
+        admission.acquire(route, user_id)
+    except AdmissionDenied as e:
+        return {'error': 'Too many requests, please try again shortly'}, 429, {'Retry-After': str(e.retry_after)}
+    g.admitted = (route, user_id)
+    return None
 
 # Serve the frontend
-@app.route("/")
+def loadStaticFiles(app):
+    app.extensions['static_files'] = StaticManifest(app.static_folder) if STATIC_MANIFEST else None
+
+@routes.route("/")
 def serve_react_index():
-    return send_from_directory(app.static_folder, "index.html")
+    return serve_static_files("index.html")
 
-@app.route("/<path:path>")
+@routes.route("/<path:path>")
 def serve_static_files(path):
-    file_path = os.path.join(app.static_folder, path)
+    staticFiles = current_app.extensions['static_files']
+    if staticFiles is not None:
+        # Unknown paths are client-side routes
+        entry = staticFiles.lookup(path) or staticFiles.lookup("index.html")
+        if entry is None:
+            abort(404)
+        return staticFiles.send(entry)
+
+    file_path = os.path.join(current_app.static_folder, path)
     if os.path.exists(file_path):
-        return send_from_directory(app.static_folder, path)
+        return send_from_directory(current_app.static_folder, path)
     else:
-        return send_from_directory(app.static_folder, "index.html")
-
-@app.route("/api/hello")
+        return send_from_directory(current_app.static_folder, "index.html")
+
+# Stored files for DATA_BACKEND=local, which has no storage service of its own
+if DATA_BACKEND == 'local':
+    LOCAL_STORAGE_BUCKETS = ('resume',)
+
+    @routes.route("/api/local-storage/<bucket>/<path:name>")
+    def serve_local_storage(bucket, name):
+        # The SQLite database lives beside the storage directory, so nothing outside a known bucket is served
+        if bucket not in LOCAL_STORAGE_BUCKETS:
+            abort(404)
+        storage = getSupabase().storage
+        directory = storage.from_(bucket).directory
+        root = os.path.realpath(storage.directory)
+        if not os.path.realpath(os.path.join(directory, name)).startswith(root + os.sep):
+            abort(404)
+        return send_from_directory(directory, name)
+
+@routes.route("/api/hello")
 def hello():
     return {"message": "Hello from Flask!!!"}
 
+def component_stats():
+    return {
+        'auth': dict(getVerifier().stats),
+        'text': dict(textCache.stats),
+        'blobs': dict(blobMirror.stats),
+        'match': matchCache.snapshot(),
+        'user': userCache.snapshot(),
+        'analysisQueue': dict(getAnalysisQueue().stats, pending=getAnalysisQueue().pending()),
+        'pdf': dict(getPdfExtractor().stats),
+        'admission': admission.snapshot()
+    }
+
+# Hit/miss counters for the in-process caches
+@routes.route("/api/cache-stats")
+def cache_stats():
+    return component_stats(), 200
+
+# Prometheus scrape target: request and per-phase latency histograms plus the cache counters
+@routes.route("/api/metrics")
+def metrics_endpoint():
+    return Response(registry.render(component_stats()), mimetype='text/plain; version=0.0.4')
+
+@timed('auth')
 def authenticate_with_clerk(request):
-    sdk = Clerk(bearer_auth=os.getenv('CLERK_SECRET_KEY'))
-    request_state = sdk.authenticate_request(
-        request,
-        AuthenticateRequestOptions(
-            authorized_parties=['http://127.0.0.1:5000', 'http://localhost:5173']
-        )
-    )
+    # Shared verifier: cached JWKS and already-verified tokens, see auth.py
+    request_state = getVerifier().authenticate(request)
+    return request_state
+
+@timed('auth')
+async def authenticate_with_clerk_async(request):
+    # Already-verified tokens are answered on the loop, a signature check (maybe with a JWKS fetch) on a thread
+    verifier = getVerifier()
+    request_state = verifier.recall(request)
+    if request_state is None:
+        request_state = await asyncio.to_thread(verifier.verify, request)
     return request_state
 
+@timed('auth')
 def update_onboarding_status(user_id, status):
-    sdk = Clerk(bearer_auth=os.getenv('CLERK_SECRET_KEY'))
+    sdk = getVerifier().sdk
     sdk.users.update_metadata(
         user_id=user_id,
         public_metadata={
@@ -75,7 +280,7 @@ def update_onboarding_status(user_id, status):
 # error 405 user details not provided
 # error 500 error fetching user from db
 # response 200 successful
-@app.route('/api/user', methods=['POST', 'PUT', 'DELETE', 'GET'])
+@routes.route('/api/user', methods=['POST', 'PUT', 'DELETE', 'GET'])
 def user_endpoint():
     request_state = authenticate_with_clerk(request)
 
@@ -188,7 +393,7 @@ def user_endpoint():
 # error 401 user not signed in
 # error 400 user id not found
 # response 200 successful
-@app.route('/api/userId', methods=['GET'])
+@routes.route('/api/userId', methods=['GET'])
 def get_user_id():
     request_state = authenticate_with_clerk(request)
 
@@ -204,8 +409,10 @@ def get_user_id():
 # error 401 user not signed in
 # error 400 user id not found
 # error 402 incorrect file type uploaded
+# error 413 file too large
 # response 200 successful
-@app.route('/api/resume-upload', methods=['POST'])
+# error 429 too many requests from this user, retry after Retry-After seconds
+@routes.route('/api/resume-upload', methods=['POST'])
 def get_resume():
     request_state = authenticate_with_clerk(request)
     if not request_state.is_signed_in:
@@ -215,31 +422,93 @@ def get_resume():
     if not user_id:
         return {'error': 'User ID not found'}, 400
 
+    rejected = admit(user_id, 'upload')
+    if rejected:
+        return rejected
+
     # GETTING PDF
-    if 'pdf' not in request.files:
+    # The body is parsed once into a PdfUploadStream, which hashes and size-checks it on the way in
+    try:
+        files = request.files
+    except RequestEntityTooLarge:
+        return {'error': f'File too large (max {MAX_UPLOAD_BYTES} bytes)'}, 413
+    if 'pdf' not in files:
+        return {'error': 'Incorrect file type provided'}, 402
+    file = files['pdf']
+    if not file.stream.is_pdf:
         return {'error': 'Incorrect file type provided'}, 402
-    file = request.files['pdf']
     # filename = secure_filename(file.filename)
     filename = file.filename
-    filepath = os.path.join(UPLOAD_FOLDER, filename)
-    file.save(filepath)
 
     # GETTING CATEGORIES
     category_id = request.form.get('categoryId')
 
-    streamFile = BufferedReader(file.stream)
-    uploadFile(user_id, "resume", filename, streamFile, category_id)
+    try:
+        uploadFile(user_id, "resume", filename, file.stream, category_id, content_hash=file.stream.sha256)
+    finally:
+        file.stream.close()
 
     # print(f"Received resume file: {file.filename} from user: {user_id}", file=sys.stderr)
     return {'message': f'Upload successful - {filename}'}, 200
 
-# Get all categories for a user
-@app.route('/api/categories', methods=['GET', 'POST'])
-def categories_handler():
+# Upload many resumes at once, all into the same category
+# Send each file as a `pdfs` part. Files that aren't PDFs are rejected
+# individually, the rest are stored in parallel and inserted together.
+# error 400 too many files
+# error 402 no files
+# error 413 a file is too large
+# error 429 too many requests from this user, retry after Retry-After seconds
+@routes.route('/api/resume-upload/batch', methods=['POST'])
+def upload_resume_batch():
     request_state = authenticate_with_clerk(request)
     if not request_state.is_signed_in:
         return {'error': 'User not signed in'}, 401
 
+    user_id = request_state.payload.get('sub')
+    if not user_id:
+        return {'error': 'User ID not found'}, 400
+
+    rejected = admit(user_id, 'upload')
+    if rejected:
+        return rejected
+
+    try:
+        files = request.files.getlist('pdfs')
+    except RequestEntityTooLarge:
+        return {'error': f'File too large (max {MAX_UPLOAD_BYTES} bytes)'}, 413
+    if not files:
+        return {'error': 'No files provided'}, 402
+    if len(files) > MAX_BATCH_FILES:
+        return {'error': f'At most {MAX_BATCH_FILES} files per batch'}, 400
+
+    category_id = request.form.get('categoryId')
+
+    try:
+        accepted = [(f.filename, f.stream, f.stream.sha256) for f in files if f.stream.is_pdf]
+        results = iter(uploadFiles(user_id, "resume", accepted, category_id, max_workers=UPLOAD_MAX_WORKERS))
+        statuses = []
+        for f in files:
+            if f.stream.is_pdf:
+                statuses.append(next(results))
+            else:
+                statuses.append({'filename': f.filename, 'status': 'rejected', 'error': 'Incorrect file type provided'})
+    except Exception as e:
+        print(f"Error uploading resumes: {e}", file=sys.stderr)
+        return {'error': str(e)}, 500
+    finally:
+        for f in files:
+            f.stream.close()
+
+    uploaded = sum(1 for r in statuses if r['status'] == 'uploaded')
+    return {'message': f'Uploaded {uploaded} of {len(files)} files', 'results': statuses}, 200
+
+# Get all categories for a user
+@routes.route('/api/categories', methods=['GET', 'POST'])
+async def categories_handler():
+    request_state = await authenticate_with_clerk_async(request)
+    if not request_state.is_signed_in:
+        return {'error': 'User not signed in'}, 401
+
     user_id = request_state.payload.get('sub')
     if not user_id:
         return {'error': 'User ID not found'}, 400
@@ -247,43 +516,18 @@ def categories_handler():
     # GET: Fetch all categories
     if request.method == 'GET':
         try:
-            # Get categories
-            categories_response = getCategories(user_id)
-            # Get resume counts per category
-            counts_response = getResumesCount(user_id)
-            
-            # Ensure categories_response.data is a list, default to empty list if not
+            # Categories, per-category counts and the overall total come back from one RPC call
+            response = await getCategoriesWithCountsAsync(user_id)
+
+            # Default to no categories and zero counts if the call failed
             categories = []
-            if hasattr(categories_response, 'data') and isinstance(categories_response.data, list):
-                categories = categories_response.data
-            elif hasattr(categories_response, 'error') and categories_response.error:
-                print(f"Error fetching categories data: {categories_response.error}", file=sys.stderr)
-            
-            count_by_category = {}
-            
-            # Ensure counts_response.data is a list before iterating, default to empty if not
-            uncategorized_count = 0
-            if hasattr(counts_response, 'data') and isinstance(counts_response.data, list):
-                for item in counts_response.data:
-                    # Ensure item is a dict and has the required keys
-                    if isinstance(item, dict) and 'category_id' in item and 'count' in item:
-                        if item['category_id'] is None:
-                            uncategorized_count = item['count']
-                        else:
-                            count_by_category[str(item['category_id'])] = item['count']
-            elif hasattr(counts_response, 'error') and counts_response.error:
-                # If there was an error fetching counts, log it and continue with empty counts
-                print(f"Error fetching resume counts: {counts_response.error}", file=sys.stderr)
-            
-            # Add resume count to each category
-            for category in categories: # categories is now guaranteed to be a list
-                if isinstance(category, dict) and 'id' in category:
-                    category['resumeCount'] = count_by_category.get(str(category['id']), 0)
-                
-            # Count all resumes for this user (for "All Resumes" category)
-            # Include both categorized and uncategorized resumes
-            all_resumes_count = sum(count_by_category.values()) + uncategorized_count
-            
+            all_resumes_count = 0
+            if hasattr(response, 'data') and isinstance(response.data, dict):
+                categories = response.data.get('categories') or []
+                all_resumes_count = response.data.get('total', 0)
+            elif hasattr(response, 'error') and response.error:
+                print(f"Error fetching categories data: {response.error}", file=sys.stderr)
+
             # Add "All" category
             categories.insert(0, {
                 'id': 'all',
@@ -305,7 +549,7 @@ def categories_handler():
             return {'error': 'Category name is required'}, 400
             
         try:
-            response = createCategory(user_id, name.strip())
+            response = await asyncio.to_thread(createCategory, user_id, name.strip())
             
             if hasattr(response, 'error') and response.error:
                 error_message = "Failed to create category."
@@ -325,7 +569,7 @@ def categories_handler():
             return {'error': str(e)}, 500
 
 # Handle specific category operations (update/delete/get)
-@app.route('/api/categories/<category_id>', methods=['GET', 'PUT', 'DELETE'])
+@routes.route('/api/categories/<category_id>', methods=['GET', 'PUT', 'DELETE'])
 def category_handler(category_id):
     request_state = authenticate_with_clerk(request)
     if not request_state.is_signed_in:
@@ -410,33 +654,46 @@ def category_handler(category_id):
             print(f"Error deleting category: {e}", file=sys.stderr)
             return {'error': str(e)}, 500
 
-# Get resumes for a category
-@app.route('/api/categories/<category_id>/resumes', methods=['GET'])
-def get_category_resumes(category_id):
-    request_state = authenticate_with_clerk(request)
+def page_args():
+    # Keyset pagination parameters shared by the resume listing endpoints
+    cursor = request.args.get('cursor') or None
+    limit = request.args.get('limit', RESUME_PAGE_SIZE, type=int)
+    return cursor, limit
+
+# Get resumes for a category, one page at a time (follow nextCursor for more)
+# error 400 invalid cursor
+@routes.route('/api/categories/<category_id>/resumes', methods=['GET'])
+async def get_category_resumes(category_id):
+    request_state = await authenticate_with_clerk_async(request)
     if not request_state.is_signed_in:
         return {'error': 'User not signed in'}, 401
 
     user_id = request_state.payload.get('sub')
     if not user_id:
         return {'error': 'User ID not found'}, 400
-        
+
+    cursor, limit = page_args()
     try:
+        # Only the columns the category page shows
+        columns = 'id, name, category_id, date, link, byte_size'
         if category_id == 'all':
             # Get all resumes for the user
-            response = getResumesByCategory(user_id)
+            response = await getResumesPageAsync(user_id, columns=columns, cursor=cursor, limit=limit)
         else:
             # Get resumes for specific category
-            response = getResumesByCategory(user_id, category_id)
-            
-        resumes = response.data
-        return {'resumes': resumes}, 200
+            response = await getResumesPageAsync(user_id, category_id, columns=columns, cursor=cursor, limit=limit)
+
+        if response.error:
+            raise Exception(response.error)
+        return {'resumes': response.data['resumes'], 'nextCursor': response.data['nextCursor']}, 200
+    except ValueError as e:
+        return {'error': str(e)}, 400
     except Exception as e:
         print(f"Error fetching resumes: {e}", file=sys.stderr)
         return {'error': str(e)}, 500
 
 # Delete a resume
-@app.route('/api/resumes/<resume_id>', methods=['DELETE'])
+@routes.route('/api/resumes/<resume_id>', methods=['DELETE'])
 def delete_resume(resume_id):
     request_state = authenticate_with_clerk(request)
     if not request_state.is_signed_in:
@@ -453,15 +710,8 @@ def delete_resume(resume_id):
         if not (hasattr(response, 'data') and response.data and len(response.data) > 0):
             return {'error': 'Resume not found or not authorized'}, 404
         
-        # Get file name to delete from storage
-        file_name = response.data[0]['name']
-        
-        # Delete file from storage
-        try:
-            deleteResumeFileFromStorage('resume', file_name)
-        except Exception as storage_error:
-            print(f"Warning: Could not delete file from storage: {storage_error}", file=sys.stderr)
-        
+        resume = response.data[0]
+
         # Delete resume record from database
         delete_response = deleteResumeFromDB(resume_id, user_id)
         
@@ -472,6 +722,12 @@ def delete_resume(resume_id):
             elif isinstance(delete_response.error, dict) and 'message' in delete_response.error:
                 error_message = delete_response.error['message']
             raise Exception(error_message)
+
+        # Delete file from storage once no other revision shares it
+        try:
+            releaseResumeFile('resume', resume)
+        except Exception as storage_error:
+            print(f"Warning: Could not delete file from storage: {storage_error}", file=sys.stderr)
         
         return {'message': 'Resume deleted successfully'}, 200
     except Exception as e:
@@ -479,9 +735,9 @@ def delete_resume(resume_id):
         return {'error': str(e)}, 500
         
 # Move a resume to a different category
-@app.route('/api/resumes/<resume_id>/move', methods=['PUT'])
-def move_resume(resume_id):
-    request_state = authenticate_with_clerk(request)
+@routes.route('/api/resumes/<resume_id>/move', methods=['PUT'])
+async def move_resume(resume_id):
+    request_state = await authenticate_with_clerk_async(request)
     if not request_state.is_signed_in:
         return {'error': 'User not signed in'}, 401
 
@@ -495,20 +751,20 @@ def move_resume(resume_id):
         return {'error': 'Category ID not provided'}, 400
     
     try:
-        # First check if resume belongs to user
-        response = getResumeByIdAndUser(resume_id, user_id)
+        # Check that the resume and the category both belong to the user, in parallel
+        response, category_response = await asyncio.gather(
+            getResumeByIdAndUserAsync(resume_id, user_id),
+            getCategoryByIdAndUserAsync(new_category_id, user_id)
+        )
         
         if not (hasattr(response, 'data') and response.data and len(response.data) > 0):
             return {'error': 'Resume not found or not authorized'}, 404
         
-        # Check if category exists and belongs to user
-        category_response = getCategoryByIdAndUser(new_category_id, user_id)
-        
         if not (hasattr(category_response, 'data') and category_response.data and len(category_response.data) > 0):
             return {'error': 'Category not found or not authorized'}, 404
         
         # Update resume record
-        update_response = moveResumeToCategoryInDB(resume_id, user_id, new_category_id)
+        update_response = await moveResumeToCategoryInDBAsync(resume_id, user_id, new_category_id)
         
         if hasattr(update_response, 'error') and update_response.error:
             error_message = "Failed to move resume."
@@ -523,8 +779,25 @@ def move_resume(resume_id):
         print(f"Error moving resume: {e}", file=sys.stderr)
         return {'error': str(e)}, 500
 
-@app.route('/api/get-user-resume-names', methods=['GET'])
-def getUserResumeNames():
+def bulk_resume_ids(data):
+    # Resume ids from a bulk request body, deduplicated in request order
+    ids = (data or {}).get('ids')
+    if not isinstance(ids, list) or not ids:
+        raise ValueError('ids must be a non-empty list')
+    if len(ids) > MAX_BULK_RESUMES:
+        raise ValueError(f'At most {MAX_BULK_RESUMES} ids per request')
+    try:
+        return list(dict.fromkeys(int(i) for i in ids))
+    except (TypeError, ValueError):
+        raise ValueError('ids must be resume ids')
+
+# Delete many resumes at once
+# Ownership is checked with one query, the rows are deleted in one statement and
+# unreferenced files are removed from storage in one call. Ids that don't exist
+# or belong to someone else are reported as not_found.
+# error 400 bad ids
+@routes.route('/api/resumes/bulk-delete', methods=['POST'])
+def bulk_delete_resumes():
     request_state = authenticate_with_clerk(request)
     if not request_state.is_signed_in:
         return {'error': 'User not signed in'}, 401
@@ -533,23 +806,124 @@ def getUserResumeNames():
     if not user_id:
         return {'error': 'User ID not found'}, 400
 
-    allResumes = getResumesForUser(user_id)
-    if isinstance(allResumes, MockSupabaseResponse):
+    try:
+        resume_ids = bulk_resume_ids(request.get_json(silent=True))
+    except ValueError as e:
+        return {'error': str(e)}, 400
+
+    try:
+        response = getResumesByIdsAndUser(resume_ids, user_id)
+        owned = {r['id']: r for r in response.data or []}
+
+        if owned:
+            delete_response = deleteResumesFromDB(list(owned), user_id)
+            if hasattr(delete_response, 'error') and delete_response.error:
+                raise Exception("Failed to delete resumes from database.")
+
+            # Delete files from storage once no other revision shares them
+            try:
+                releaseResumeFiles('resume', list(owned.values()))
+            except Exception as storage_error:
+                print(f"Warning: Could not delete files from storage: {storage_error}", file=sys.stderr)
+
+        results = [{'id': i, 'status': 'deleted' if i in owned else 'not_found'} for i in resume_ids]
+        return {'results': results, 'deleted': len(owned)}, 200
+    except Exception as e:
+        print(f"Error deleting resumes: {e}", file=sys.stderr)
+        return {'error': str(e)}, 500
+
+# Move many resumes to a category at once
+# error 400 bad ids / no category
+# error 404 category not found
+@routes.route('/api/resumes/bulk-move', methods=['POST'])
+def bulk_move_resumes():
+    request_state = authenticate_with_clerk(request)
+    if not request_state.is_signed_in:
+        return {'error': 'User not signed in'}, 401
+
+    user_id = request_state.payload.get('sub')
+    if not user_id:
+        return {'error': 'User ID not found'}, 400
+
+    data = request.get_json(silent=True) or {}
+    new_category_id = data.get('categoryId')
+    if not new_category_id:
+        return {'error': 'Category ID not provided'}, 400
+    try:
+        resume_ids = bulk_resume_ids(data)
+    except ValueError as e:
+        return {'error': str(e)}, 400
+
+    try:
+        category_response = getCategoryByIdAndUser(new_category_id, user_id)
+        if not (hasattr(category_response, 'data') and category_response.data and len(category_response.data) > 0):
+            return {'error': 'Category not found or not authorized'}, 404
+
+        response = getResumesByIdsAndUser(resume_ids, user_id)
+        owned = {r['id'] for r in response.data or []}
+
+        if owned:
+            update_response = moveResumesToCategoryInDB(list(owned), user_id, new_category_id)
+            if hasattr(update_response, 'error') and update_response.error:
+                raise Exception("Failed to move resumes.")
+
+        results = [{'id': i, 'status': 'moved' if i in owned else 'not_found'} for i in resume_ids]
+        return {'results': results, 'moved': len(owned)}, 200
+    except Exception as e:
+        print(f"Error moving resumes: {e}", file=sys.stderr)
+        return {'error': str(e)}, 500
+
+@routes.route('/api/get-user-resume-names', methods=['GET'])
+async def getUserResumeNames():
+    request_state = await authenticate_with_clerk_async(request)
+    if not request_state.is_signed_in:
+        return {'error': 'User not signed in'}, 401
+
+    user_id = request_state.payload.get('sub')
+    if not user_id:
+        return {'error': 'User ID not found'}, 400
+
+    cursor, limit = page_args()
+    try:
+        page = await getResumesPageAsync(user_id, columns='id, name, link, date', cursor=cursor, limit=limit)
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    if page.error:
         return {'error': 'Resumes not returned properly'}, 412
 
     # Extract resume names (you might need to adjust this depending on your data structure)
     resumes = []
-    for r in allResumes:
+    for r in page.data['resumes']:
         resumes.append({
             'name': r.get('name'),
             'link': r.get('link'),
         })
 
-    return {'resumes': resumes}, 200
-
-@app.route('/api/job-description', methods=['POST'])
-def getResumeMatch():
-    request_state = authenticate_with_clerk(request)
+    return {'resumes': resumes, 'nextCursor': page.data['nextCursor']}, 200
+
+def getResumeText(user_id, resume_link):
+    # Use the text stored at upload time, only falling back to downloading the PDF for old rows
+    resume_text = None
+    text_response = getResumeTextByLink(user_id, resume_link)
+    if hasattr(text_response, 'data') and text_response.data:
+        resume_text = text_response.data[0].get('text_content')
+    if resume_text is None:
+        resume_text = readPdf(resume_link)
+    return resume_text
+
+async def getResumeTextAsync(user_id, resume_link):
+    resume_text = None
+    text_response = await getResumeTextByLinkAsync(user_id, resume_link)
+    if hasattr(text_response, 'data') and text_response.data:
+        resume_text = text_response.data[0].get('text_content')
+    if resume_text is None:
+        resume_text = await asyncio.to_thread(readPdf, resume_link)
+    return resume_text
+
+# error 429 too many requests from this user, retry after Retry-After seconds
+@routes.route('/api/job-description', methods=['POST'])
+async def getResumeMatch():
+    request_state = await authenticate_with_clerk_async(request)
     if not request_state.is_signed_in:
         return {'error': 'User not signed in'}, 401
 
@@ -557,6 +931,10 @@ def getResumeMatch():
     if not user_id:
         return {'error': 'User ID not found'}, 400
 
+    rejected = admit(user_id, 'analyze')
+    if rejected:
+        return rejected
+
     data = request.get_json()
     resumeLink = data.get('resumeLink')
 
@@ -571,8 +949,207 @@ def getResumeMatch():
     # for resume in allResumes:
     #     allPdfTexts.append(readPdf(resume.get('link')))
 
-    result, status = compareResumeJobDesc(job_description, readPdf(resumeLink))
+    resume_text = await getResumeTextAsync(user_id, resumeLink)
+
+    result, status = await compareResumeJobDescAsync(job_description, resume_text)
+    if status != 200:
+        return {'error': result.get('error')}, status
     reply = result['response']
     # print(reply.response)
 
     return {'analysis': reply}, 200
+
+# error 401 user not signed in
+# error 400 user id or job description not found, or shortlist not a number
+# error 500 error fetching resumes from db
+# response 200 successful, resumes ranked best match first
+# error 429 too many requests from this user, retry after Retry-After seconds
+@routes.route('/api/job-description/rank', methods=['POST'])
+async def rankResumeMatches():
+    request_state = await authenticate_with_clerk_async(request)
+    if not request_state.is_signed_in:
+        return {'error': 'User not signed in'}, 401
+
+    user_id = request_state.payload.get('sub')
+    if not user_id:
+        return {'error': 'User ID not found'}, 400
+
+    rejected = admit(user_id, 'analyze')
+    if rejected:
+        return rejected
+
+    data = request.get_json()
+    job_description = data.get('jobDescription')
+    if not job_description:
+        return {'error': 'Job description not provided'}, 400
+
+    # Clients may ask for fewer LLM comparisons than RANK_SHORTLIST, never more
+    try:
+        shortlist = int(data.get('shortlist') or RANK_SHORTLIST)
+    except (TypeError, ValueError, OverflowError):
+        return {'error': 'shortlist must be a number'}, 400
+    shortlist = min(max(shortlist, 1), RANK_SHORTLIST)
+
+    try:
+        response = await getResumeTextsForUserAsync(user_id)
+        if hasattr(response, 'error') and response.error:
+            raise Exception(response.error)
+        resumes = response.data or []
+    except Exception as e:
+        print(f"Error fetching resumes for ranking: {e}", file=sys.stderr)
+        return {'error': str(e)}, 500
+
+    # Keyword pre-ranking picks the shortlist, then the LLM calls are awaited together, at most RANK_MAX_WORKERS at once
+    ranked = await rankResumesAsync(job_description, resumes, max_concurrency=RANK_MAX_WORKERS,
+                                    shortlist=shortlist, user_id=user_id)
+    return {'resumes': ranked}, 200
+
+# error 401 user not signed in
+# error 400 user id or job description not found
+# error 500 error fetching resumes from db
+# response 200 successful, offline keyword ranking with matched keywords (no LLM call)
+@routes.route('/api/job-description/keywords', methods=['POST'])
+def keywordResumeMatches():
+    request_state = authenticate_with_clerk(request)
+    if not request_state.is_signed_in:
+        return {'error': 'User not signed in'}, 401
+
+    user_id = request_state.payload.get('sub')
+    if not user_id:
+        return {'error': 'User ID not found'}, 400
+
+    data = request.get_json()
+    job_description = data.get('jobDescription')
+    if not job_description:
+        return {'error': 'Job description not provided'}, 400
+
+    try:
+        response = getResumeTextsForUser(user_id)
+        if hasattr(response, 'error') and response.error:
+            raise Exception(response.error)
+        resumes = response.data or []
+    except Exception as e:
+        print(f"Error fetching resumes for keyword ranking: {e}", file=sys.stderr)
+        return {'error': str(e)}, 500
+
+    return {'resumes': keywordRank(job_description, resumes, user_id)}, 200
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+# error 401 user not signed in
+# error 400 user id or job description not found
+# response 200 text/event-stream: 'token' events with {'text'}, then one 'end' event
+#   with the full {'analysis'} or one 'error' event with {'error'}
+# error 429 too many requests from this user, retry after Retry-After seconds
+@routes.route('/api/job-description/stream', methods=['POST'])
+def streamResumeMatch():
+    request_state = authenticate_with_clerk(request)
+    if not request_state.is_signed_in:
+        return {'error': 'User not signed in'}, 401
+
+    user_id = request_state.payload.get('sub')
+    if not user_id:
+        return {'error': 'User ID not found'}, 400
+
+    rejected = admit(user_id, 'analyze')
+    if rejected:
+        return rejected
+
+    data = request.get_json()
+    resumeLink = data.get('resumeLink')
+    job_description = data.get('jobDescription')
+    if not job_description:
+        return {'error': 'Job description not provided'}, 400
+
+    resume_text = getResumeText(user_id, resumeLink)
+
+    def generate():
+        parts = []
+        try:
+            for delta in streamResumeJobDesc(job_description, resume_text):
+                parts.append(delta)
+                yield sse_event('token', {'text': delta})
+            yield sse_event('end', {'analysis': ''.join(parts)})
+        except CircuitOpenError as e:
+            print(f"[OpenAI Error] {e}", file=sys.stderr)
+            yield sse_event('error', {'error': 'Job analysis is temporarily unavailable, please try again shortly'})
+        except Exception as e:
+            print(f"[OpenAI Error] {e}", file=sys.stderr)
+            yield sse_event('error', {'error': 'Failed to contact OpenAI'})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        # Keep proxies from buffering the stream
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def analyzeResume(user_id, resume_link, job_description):
+    # Runs on an analysis worker thread, see jobqueue.py; the job holds the user's analyze slot until it ends
+    try:
+        result, status = compareResumeJobDesc(job_description, getResumeText(user_id, resume_link))
+    finally:
+        admission.release('analyze', user_id)
+    if status != 200:
+        raise Exception(result.get('error'))
+    return {'analysis': result['response']}
+
+# error 401 user not signed in
+# error 400 user id or job description not found
+# error 429 analysis queue full, retry later
+# response 202 job queued, poll /api/job-description/jobs/<jobId>
+# error 429 too many requests from this user, retry after Retry-After seconds
+@routes.route('/api/job-description/jobs', methods=['POST'])
+def submitResumeMatch():
+    request_state = authenticate_with_clerk(request)
+    if not request_state.is_signed_in:
+        return {'error': 'User not signed in'}, 401
+
+    user_id = request_state.payload.get('sub')
+    if not user_id:
+        return {'error': 'User ID not found'}, 400
+
+    rejected = admit(user_id, 'analyze')
+    if rejected:
+        return rejected
+
+    data = request.get_json()
+    resumeLink = data.get('resumeLink')
+    job_description = data.get('jobDescription')
+    if not job_description:
+        return {'error': 'Job description not provided'}, 400
+
+    try:
+        job_id = getAnalysisQueue().submit(user_id, analyzeResume, user_id, resumeLink, job_description)
+    except QueueFullError as e:
+        return {'error': str(e)}, 429, {'Retry-After': '5'}
+    # Queued: the slot is now released by the job, not at the end of this request
+    g.pop('admitted')
+
+    return {'jobId': job_id, 'status': 'queued'}, 202
+
+# error 401 user not signed in
+# error 400 user id not found
+# error 404 job not found or not authorized
+# response 200 job status, with 'analysis' once done or 'error' if it failed
+@routes.route('/api/job-description/jobs/<job_id>', methods=['GET'])
+def getResumeMatchJob(job_id):
+    request_state = authenticate_with_clerk(request)
+    if not request_state.is_signed_in:
+        return {'error': 'User not signed in'}, 401
+
+    user_id = request_state.payload.get('sub')
+    if not user_id:
+        return {'error': 'User ID not found'}, 400
+
+    job = getAnalysisQueue().store.get(job_id, user_id)
+    if job is None:
+        return {'error': 'Job not found or not authorized'}, 404
+
+    response = {'jobId': job['jobId'], 'status': job['status']}
+    if job['result']:
+        response.update(job['result'])
+    if job['error']:
+        response['error'] = job['error']
+    return response, 200
\ No newline at end of file
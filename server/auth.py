@@ -0,0 +1,198 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.cookies import SimpleCookie
+
+import jwt
+import requests
+from cryptography.hazmat.primitives import serialization
+from jwt.algorithms import RSAAlgorithm
+
+AUTHORIZED_PARTIES = ['http://127.0.0.1:5000', 'http://localhost:5173']
+
+class ClerkVerifier:
+    """Process-wide session token verifier.
+
+    Keeps one Clerk SDK instance, caches the JWKS by `kid` (refetching when the
+    TTL runs out or an unknown `kid` shows up) and remembers tokens that were
+    already verified until their `exp`, so a warm request never touches the network.
+    """
+
+    def __init__(self, secret_key, api_url='https://api.clerk.com', jwks_ttl=3600,
+                 min_refresh_interval=10, max_tokens=10000, authorized_parties=None):
+        self.secret_key = secret_key
+        self.api_url = api_url.rstrip('/')
+        self.jwks_ttl = jwks_ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.max_tokens = max_tokens
+        self.authorized_parties = authorized_parties or AUTHORIZED_PARTIES
+
+        self._sdk = None
+        self._session = requests.Session()
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._keys = {}  # kid -> PEM public key
+        self._keys_fetched_at = 0.0
+        self._tokens = OrderedDict()  # token -> (payload, exp)
+        self.stats = {'token_hits': 0, 'token_misses': 0, 'jwks_fetches': 0}
+
+    @property
+    def sdk(self):
+        """Clerk SDK instance for backend API calls, created on first use (the SDK is slow to import)."""
+        if self._sdk is None:
+            with self._lock:
+                if self._sdk is None:
+                    from clerk_backend_api import Clerk
+                    self._sdk = Clerk(bearer_auth=self.secret_key, server_url=f"{self.api_url}/v1")
+        return self._sdk
+
+    def _fetchJwks(self):
+        response = self._session.get(
+            f"{self.api_url}/v1/jwks",
+            headers={'Accept': 'application/json', 'Authorization': f'Bearer {self.secret_key}'},
+            timeout=5
+        )
+        response.raise_for_status()
+
+        keys = {}
+        for jwk in response.json().get('keys', []):
+            public_key = RSAAlgorithm.from_jwk(jwk)
+            keys[jwk.get('kid')] = public_key.public_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PublicFormat.SubjectPublicKeyInfo
+            ).decode('utf-8')
+        return keys
+
+    def _cachedKey(self, kid):
+        """(PEM or None, whether the JWKS should be refetched) from what is cached."""
+        with self._lock:
+            age = time.monotonic() - self._keys_fetched_at
+            fresh = self._keys_fetched_at and age < self.jwks_ttl
+            if fresh and kid in self._keys:
+                return self._keys[kid], False
+            # Unknown kid on a fresh JWKS: only refetch if we haven't just done so
+            return None, not (fresh and age < self.min_refresh_interval)
+
+    def getKey(self, kid):
+        """Return the PEM for `kid`, refreshing the JWKS if it is stale or missing the key."""
+        pem, refresh = self._cachedKey(kid)
+        if not refresh:
+            return pem
+        # One fetch at a time, made without holding self._lock so cached tokens are still served meanwhile
+        with self._refresh_lock:
+            pem, refresh = self._cachedKey(kid)
+            if not refresh:
+                return pem
+            try:
+                keys = self._fetchJwks()
+            except Exception as e:
+                print(f"Error fetching JWKS: {e}", file=sys.stderr)
+                keys = None
+            with self._lock:
+                if keys is not None:
+                    self._keys = keys
+                    self._keys_fetched_at = time.monotonic()
+                    self.stats['jwks_fetches'] += 1
+                return self._keys.get(kid)
+
+    def _rememberToken(self, token, payload):
+        exp = payload.get('exp')
+        if not exp:
+            return
+        with self._lock:
+            self._tokens[token] = (payload, exp)
+            self._tokens.move_to_end(token)
+            while len(self._tokens) > self.max_tokens:
+                self._tokens.popitem(last=False)
+
+    def _recallToken(self, token):
+        with self._lock:
+            entry = self._tokens.get(token)
+            if entry is None:
+                return None
+            payload, exp = entry
+            if exp <= time.time():
+                del self._tokens[token]
+                return None
+            self._tokens.move_to_end(token)
+            return payload
+
+    def recall(self, request):
+        """RequestState for a request that can be settled without verifying a signature:
+        no token, no secret key or an already-verified token. None if the token has to be
+        verified, which may fetch the JWKS."""
+        from clerk_backend_api.jwks_helpers import AuthErrorReason, AuthStatus, RequestState
+
+        token = getSessionToken(request)
+        if token is None:
+            return RequestState(status=AuthStatus.SIGNED_OUT, reason=AuthErrorReason.SESSION_TOKEN_MISSING)
+        if not self.secret_key:
+            return RequestState(status=AuthStatus.SIGNED_OUT, reason=AuthErrorReason.SECRET_KEY_MISSING)
+
+        payload = self._recallToken(token)
+        if payload is None:
+            return None
+        self.stats['token_hits'] += 1
+        return RequestState(status=AuthStatus.SIGNED_IN, token=token, payload=dict(payload))
+
+    def authenticate(self, request):
+        request_state = self.recall(request)
+        if request_state is not None:
+            return request_state
+        return self.verify(request)
+
+    def verify(self, request):
+        from clerk_backend_api.jwks_helpers import (
+            AuthenticateRequestOptions, AuthStatus, RequestState, TokenVerificationErrorReason,
+            authenticate_request
+        )
+
+        self.stats['token_misses'] += 1
+        token = getSessionToken(request)
+        try:
+            kid = jwt.get_unverified_header(token).get('kid')
+        except jwt.InvalidTokenError:
+            return RequestState(status=AuthStatus.SIGNED_OUT, reason=TokenVerificationErrorReason.TOKEN_INVALID)
+
+        pem = self.getKey(kid)
+        if pem is None:
+            return RequestState(status=AuthStatus.SIGNED_OUT, reason=TokenVerificationErrorReason.JWK_KID_MISMATCH)
+
+        # Networkless verification through the SDK now that we have the key
+        request_state = authenticate_request(
+            request,
+            AuthenticateRequestOptions(jwt_key=pem, authorized_parties=self.authorized_parties)
+        )
+        if request_state.is_signed_in:
+            self._rememberToken(token, dict(request_state.payload))
+        return request_state
+
+def getSessionToken(request):
+    """Same lookup order as the Clerk SDK: Authorization header, then the __session cookie."""
+    bearer_token = request.headers.get('Authorization')
+    if bearer_token is not None:
+        return bearer_token.replace('Bearer ', '')
+
+    cookie_header = request.headers.get('cookie')
+    if cookie_header is not None:
+        for key, value in SimpleCookie(cookie_header).items():
+            if key.startswith('__session'):
+                return value.value
+    return None
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+def getVerifier():
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = ClerkVerifier(
+                    os.getenv('CLERK_SECRET_KEY'),
+                    api_url=os.getenv('CLERK_API_URL') or 'https://api.clerk.com',
+                    jwks_ttl=int(os.getenv('CLERK_JWKS_TTL') or 3600)
+                )
+    return _verifier
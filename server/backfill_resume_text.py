@@ -0,0 +1,57 @@
+"""Fill in text_content, page_count and byte_size for resumes uploaded before migration 004.
+
+Usage (from server/): uv run python backfill_resume_text.py [--batch-size N] [--dry-run]
+"""
+import argparse
+import sys
+
+from dotenv import load_dotenv
+
+# Before importing database/jobmatch, which read their settings from the environment
+load_dotenv()
+
+from database import getResumesMissingText, updateResumeText
+from jobmatch import extractPdf, fetchPdf
+
+def backfill(batch_size=50, dry_run=False):
+    last_id = 0
+    updated = failed = 0
+    while True:
+        response = getResumesMissingText(after_id=last_id, limit=batch_size)
+        rows = response.data or []
+        if not rows:
+            break
+
+        for row in rows:
+            last_id = row['id']
+            try:
+                data = fetchPdf(row['link'])
+            except Exception as e:
+                # Leave the row alone so a later run can retry it
+                print(f"Could not download resume {row['id']} ({row['name']}): {e}", file=sys.stderr)
+                failed += 1
+                continue
+
+            try:
+                text_content, page_count, truncated = extractPdf(data)
+                if truncated:
+                    print(f"Resume {row['id']} ({row['name']}): text truncated at the page or time limit", file=sys.stderr)
+            except Exception as e:
+                # Unparseable PDF: store empty text so it isn't retried forever
+                print(f"Could not parse resume {row['id']} ({row['name']}): {e}", file=sys.stderr)
+                text_content, page_count = '', None
+
+            if not dry_run:
+                updateResumeText(row['id'], text_content, page_count, len(data))
+            updated += 1
+            print(f"Resume {row['id']}: {page_count} pages, {len(data)} bytes, {len(text_content)} chars")
+
+    print(f"Backfill complete - {updated} updated, {failed} failed")
+    return updated, failed
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--dry-run', action='store_true', help='extract text without writing it back')
+    args = parser.parse_args()
+    backfill(args.batch_size, args.dry_run)
@@ -0,0 +1,125 @@
+"""One user flooding /api/job-description while another uses it normally, with and without admission control.
+
+The LLM is a local fake with a fixed number of connections standing in for the
+upstream quota. Reports the normal user's latency and, for the flooding user,
+how many requests got through, how many were refused with 429 and how fast.
+
+Run from server/:  python -m bench.admission_bench [--seconds S] [--flood N] [--think SECONDS] [--llm-latency SECONDS]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.endpoint_bench import JOB_DESCRIPTION, percentile
+from bench.fakes import AsyncFakeSupabase, FakeClerk, FakeLLM, FakeSupabase
+
+warnings.filterwarnings('ignore', message='authenticate_request method is applicable')
+
+USERS = ('user_flood', 'user_normal')
+
+def seed(database):
+    links = {}
+    for user_id in USERS:
+        database.createUser(user_id, f"{user_id}@example.com", user_id)
+        link = f"http://127.0.0.1/api/local-storage/resume/{user_id}.pdf"
+        database.getSupabase().table('resumes').insert({
+            'clerk_id': user_id, 'name': f"{user_id}.pdf", 'link': link, 'date': '2025-01-01',
+            'text_content': 'Python, Flask and Postgres on AWS. Designed APIs and cut p95 latency.'
+        }).execute()
+        links[user_id] = link
+    return links
+
+def run(app, clerk, links, label, seconds, flood, think):
+    tokens = {user_id: clerk.mintToken(sub=user_id, ttl=3600) for user_id in USERS}
+    stop = time.perf_counter() + seconds
+    outcomes = {user_id: [] for user_id in USERS}
+    lock = threading.Lock()
+
+    def loop(user_id, worker):
+        client = app.test_client()
+        headers = {'Authorization': f"Bearer {tokens[user_id]}"}
+        i = 0
+        while time.perf_counter() < stop:
+            i += 1
+            body = {'jobDescription': f"{JOB_DESCRIPTION} ({label} {user_id} {worker}-{i})", 'resumeLink': links[user_id]}
+            start = time.perf_counter()
+            response = client.post('/api/job-description', json=body, headers=headers)
+            elapsed = time.perf_counter() - start
+            with lock:
+                outcomes[user_id].append((response.status_code, elapsed))
+            if user_id == 'user_normal':
+                time.sleep(think)
+            elif response.status_code == 429:
+                # The flooding client ignores Retry-After, but doesn't spin outright
+                time.sleep(0.01)
+
+    with ThreadPoolExecutor(max_workers=flood + 1) as pool:
+        for worker in range(flood):
+            pool.submit(loop, 'user_flood', worker)
+        pool.submit(loop, 'user_normal', 0)
+    return outcomes
+
+def report(label, outcomes):
+    print(f"\n{label}")
+    for user_id in USERS:
+        by_status = {}
+        for status, elapsed in outcomes[user_id]:
+            by_status.setdefault(status, []).append(elapsed)
+        for status, durations in sorted(by_status.items()):
+            durations.sort()
+            print(f"  {user_id:<12} {status}: {len(durations):>5} requests, "
+                  f"p50 {percentile(durations, 50) * 1e3:8.1f} ms, p95 {percentile(durations, 95) * 1e3:8.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=10.0, help='length of each run')
+    parser.add_argument('--flood', type=int, default=24, help='concurrent requests kept up by the flooding user')
+    parser.add_argument('--think', type=float, default=1.0, help='pause between the normal user\'s requests')
+    parser.add_argument('--llm-latency', type=float, default=0.2)
+    parser.add_argument('--llm-connections', type=int, default=8, help='upstream capacity shared by everyone')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='resumevc-admission-')
+    clerk = FakeClerk().start()
+    llm = FakeLLM(latency=args.llm_latency).start()
+    os.environ.update({
+        'CLERK_SECRET_KEY': 'sk_test_bench',
+        'CLERK_API_URL': clerk.url,
+        'GEMINI_API_KEY': 'bench',
+        'LLM_BASE_URL': llm.url + '/v1/',
+        'LLM_POOL_SIZE': str(args.llm_connections),
+        'DATA_BACKEND': 'local',
+        'LOCAL_DB_PATH': os.path.join(workdir, 'unused.sqlite3'),
+        'LOCAL_STORAGE_DIR': os.path.join(workdir, 'unused-storage'),
+        'TEXT_CACHE_DIR': os.path.join(workdir, 'text'),
+        'MATCH_CACHE_DB': '',
+        'SERVER_TIMING': '0'
+    })
+    import app as app_module
+    import database
+    from admission import AdmissionControl, Limit
+
+    fake_db = FakeSupabase(os.path.join(workdir, 'supabase'))
+    database.setSupabase(fake_db)
+    database.setAsyncSupabase(AsyncFakeSupabase(fake_db))
+    app = app_module.create_app()
+    links = seed(database)
+
+    configured = app_module.admission
+    app_module.admission = AdmissionControl({route: Limit(0, 0, 0) for route in configured.limits})
+    report('admission control off', run(app, clerk, links, 'off', args.seconds, args.flood, args.think))
+
+    app_module.admission = configured
+    report(f"admission control on, analyze {configured.limits['analyze']}",
+           run(app, clerk, links, 'on', args.seconds, args.flood, args.think))
+    print(f"  counters {configured.snapshot()}")
+
+    clerk.stop()
+    llm.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Microbenchmark of authenticate_with_clerk cost per request.
+
+Run from server/:  python -m bench.auth_bench [--requests N] [--jwks-latency SECONDS]
+"""
+import argparse
+import time
+import warnings
+
+from auth import ClerkVerifier
+from bench.fakes import FakeClerk
+
+warnings.filterwarnings('ignore', message='authenticate_request method is applicable')
+
+class FakeRequest:
+    def __init__(self, token):
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+def timeRequests(verifier, requests_):
+    start = time.perf_counter()
+    for request in requests_:
+        assert verifier.authenticate(request).is_signed_in
+    return (time.perf_counter() - start) / len(requests_)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--jwks-latency', type=float, default=0.02,
+                        help='simulated round trip to the key server, in seconds')
+    args = parser.parse_args()
+
+    with FakeClerk(latency=args.jwks_latency) as clerk:
+        token = clerk.mintToken()
+        same_token = [FakeRequest(token)] * args.requests
+        fresh_tokens = [FakeRequest(clerk.mintToken(sub=f'user_{i}')) for i in range(args.requests)]
+        n_cold = max(1, args.requests // 10)
+
+        # Old behaviour: a key fetch and full verification on every request
+        cold = ClerkVerifier('sk_test_bench', api_url=clerk.url, jwks_ttl=0, min_refresh_interval=0, max_tokens=0)
+        results = {'jwks fetch + verify (per-request SDK)': timeRequests(cold, same_token[:n_cold])}
+
+        # JWKS cached, signature checked every time
+        cached_keys = ClerkVerifier('sk_test_bench', api_url=clerk.url, max_tokens=0)
+        cached_keys.getKey(clerk.kid)
+        results['cached jwks, verify every token'] = timeRequests(cached_keys, fresh_tokens)
+
+        # JWKS cached and the token already verified
+        warm = ClerkVerifier('sk_test_bench', api_url=clerk.url)
+        warm.authenticate(same_token[0])
+        results['cached jwks + memoized token'] = timeRequests(warm, same_token)
+
+    for label, seconds in results.items():
+        print(f"{label:<40} {seconds * 1e6:>10.1f} us/request")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,510 @@
+"""Latency and throughput of every route in app.py, fully offline.
+
+Clerk, Supabase and Gemini are replaced by the stand-ins in bench/fakes.py,
+each with configurable latency. The app is driven in-process through the
+Flask test client, or over HTTP through a real threaded WSGI server
+(--mode wsgi). Every endpoint reports p50/p95/p99 latency and requests per
+second. PDF extraction throughput is measured over generated PDFs of several
+page counts, and cold start (import, create_app(), first requests) over a few
+fresh processes running bench/startup.py. Results are written as JSON. Pass
+an earlier file to --compare to see the changes since then; the exit status
+is 1 if any p95 (or median cold-start time) regressed by more than --threshold.
+
+Run from server/:  python -m bench.endpoint_bench [--requests N] [--mode client|wsgi] [--output FILE]
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.fakes import AsyncFakeSupabase, FakeClerk, FakeLLM, FakeSupabase
+from bench.pdfs import makePdf
+from precompress import precompress
+
+warnings.filterwarnings('ignore', message='authenticate_request method is applicable')
+
+USER_ID = 'user_bench'
+JOB_DESCRIPTION = (
+    "Backend engineer: Python, Flask, Postgres and AWS. You will design APIs, improve latency "
+    "and reliability, and own services on-call."
+)
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_TIMINGS = ('process_ms', 'import_ms', 'create_app_ms', 'first_request_ms', 'first_auth_db_ms',
+                   'warm_auth_db_ms', 'first_llm_client_ms')
+
+def percentile(sorted_values, q):
+    # Nearest-rank, so p99 of 50 samples is the slowest one rather than an interpolation
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), int(round(q / 100 * len(sorted_values) + 0.5))))
+    return sorted_values[rank - 1]
+
+def summarize(durations, wall, statuses, errors):
+    durations = sorted(durations)
+    return {
+        'requests': len(durations),
+        'errors': errors,
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        'p50_ms': percentile(durations, 50) * 1e3,
+        'p95_ms': percentile(durations, 95) * 1e3,
+        'p99_ms': percentile(durations, 99) * 1e3,
+        'mean_ms': sum(durations) / len(durations) * 1e3 if durations else 0.0,
+        'rps': len(durations) / wall if wall else 0.0
+    }
+
+class TestClientSender:
+    """Sends requests through Flask's test client; one client per thread."""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def send(self, method, path, headers, json=None, files=None, form=None):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        kwargs = {'headers': headers}
+        if files is not None:
+            data = dict(form or {})
+            for field, filename, content in files:
+                data.setdefault(field, []).append((io.BytesIO(content), filename))
+            kwargs.update(data=data, content_type='multipart/form-data')
+        elif json is not None:
+            kwargs['json'] = json
+        response = client.open(path, method=method, **kwargs)
+        response.get_data()  # Drain streamed bodies so they are timed too
+        return response.status_code
+
+    def close(self):
+        pass
+
+class WsgiSender:
+    """Sends requests over HTTP to the app running in a threaded Werkzeug server."""
+
+    def __init__(self, app):
+        import requests
+        from werkzeug.serving import make_server
+        self._requests = requests
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self._local = threading.local()
+
+    def send(self, method, path, headers, json=None, files=None, form=None):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self._requests.Session()
+        kwargs = {'headers': headers}
+        if files is not None:
+            kwargs['files'] = [(field, (filename, content, 'application/pdf')) for field, filename, content in files]
+            kwargs['data'] = form or {}
+        elif json is not None:
+            kwargs['json'] = json
+        response = session.request(method, self.url + path, **kwargs)
+        return response.status_code
+
+    def close(self):
+        self.server.shutdown()
+
+class Fixtures:
+    """Seeds one benchmark user and makes throwaway rows for destructive endpoints."""
+
+    def __init__(self, clerk, app_module, flask_app, database):
+        self.clerk = clerk
+        self.app = app_module
+        self.flask_app = flask_app
+        self.db = database
+        self.token = clerk.mintToken(sub=USER_ID, ttl=24 * 3600)
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+        self.run_id = uuid.uuid4().hex[:6]
+
+    def seed(self, sender, resumes):
+        sender.send('POST', '/api/user', self.headers, json={'email': 'bench@example.com', 'name': 'Bench User'})
+        self.category_ids = []
+        for name in ('Backend', 'Data', 'Frontend'):
+            self.category_ids.append(self.db.createCategory(USER_ID, name).data[0]['id'])
+        files = [('pdfs', f'seed-{i}.pdf', makePdf(1 + i % 3, seed=i)) for i in range(resumes)]
+        sender.send('POST', '/api/resume-upload/batch', self.headers, files=files,
+                    form={'categoryId': str(self.category_ids[0])})
+        self.resumes = self.db.getSupabase().table('resumes').select('id, link, content_hash').eq('clerk_id', USER_ID).execute().data
+        self.link = self.resumes[0]['link']
+
+    def insertResumes(self, count):
+        # Rows that share a seeded resume's file, so deleting them never removes it from storage
+        template = self.db.getSupabase().table('resumes').select('*').eq('id', self.resumes[0]['id']).execute().data[0]
+        rows = []
+        for i in range(count):
+            row = {k: v for k, v in template.items() if k not in ('id', 'created_at', 'updated_at')}
+            row['name'] = f"throwaway_{uuid.uuid4().hex[:8]}.pdf"
+            rows.append(row)
+        inserted = self.db.getSupabase().table('resumes').insert(rows).execute().data
+        self.db.userCache.invalidate(USER_ID)
+        return [r['id'] for r in inserted]
+
+    def throwawayUser(self, i):
+        user_id = f"user_del_{self.run_id}_{i}"
+        self.db.createUser(user_id, f"{user_id}@example.com", user_id)
+        return {'Authorization': f"Bearer {self.clerk.mintToken(sub=user_id, ttl=3600)}"}
+
+    def finishedJob(self):
+        job_id = uuid.uuid4().hex
+        self.app.getAnalysisQueue().store.create(job_id, USER_ID)
+        self.app.getAnalysisQueue().store.update(job_id, 'done', result={'response': 'Match: 70%'})
+        return job_id
+
+def buildScenarios(fx, static_asset):
+    """name -> (method, prepare(i) returning request kwargs, expected statuses)."""
+    h = fx.headers
+    category = fx.category_ids
+    resume_ids = [r['id'] for r in fx.resumes]
+    storage_path = '/' + fx.link.split('/', 3)[3]
+
+    def indexEtag():
+        static_files = fx.flask_app.extensions['static_files']
+        entry = static_files.lookup('index.html') if static_files else None
+        return f'"{entry.etag}"' if entry else '*'
+
+    def jobDescription(scenario, i):
+        # A different description for every request of every scenario, so the LLM match cache never short-circuits the call
+        return {'jobDescription': f"{JOB_DESCRIPTION} (req {fx.run_id} {scenario} {i})", 'resumeLink': fx.link}
+
+    return {
+        'GET /': ('GET', lambda i: {'path': '/'}, (200,)),
+        'GET /<static asset>': ('GET', lambda i: {'path': static_asset}, (200,)),
+        'GET /<static asset> (gzip)': ('GET', lambda i: {'path': static_asset, 'headers': {'Accept-Encoding': 'gzip'}}, (200,)),
+        'GET / (If-None-Match)': ('GET', lambda i: {'path': '/', 'headers': {'If-None-Match': indexEtag()}}, (304,)),
+        'GET /api/local-storage/<file>': ('GET', lambda i: {'path': storage_path}, (200,)),
+        'GET /api/hello': ('GET', lambda i: {'path': '/api/hello'}, (200,)),
+        'GET /api/cache-stats': ('GET', lambda i: {'path': '/api/cache-stats'}, (200,)),
+        'GET /api/metrics': ('GET', lambda i: {'path': '/api/metrics'}, (200,)),
+        'GET /api/userId': ('GET', lambda i: {'path': '/api/userId', 'headers': h}, (200,)),
+        'GET /api/user': ('GET', lambda i: {'path': '/api/user', 'headers': h, 'json': {}}, (200,)),
+        'POST /api/user': ('POST', lambda i: {
+            'path': '/api/user', 'headers': h, 'json': {'email': 'bench@example.com', 'name': 'Bench User'}
+        }, (200,)),
+        'PUT /api/user': ('PUT', lambda i: {'path': '/api/user', 'headers': h, 'json': {'name': 'Bench User'}}, (200,)),
+        'DELETE /api/user': ('DELETE', lambda i: {'path': '/api/user', 'headers': fx.throwawayUser(i), 'json': {}}, (200,)),
+        'POST /api/resume-upload': ('POST', lambda i: {
+            'path': '/api/resume-upload', 'headers': h,
+            'files': [('pdf', f'upload-{i}.pdf', makePdf(2, seed=10_000 + i))], 'form': {'categoryId': str(category[1])}
+        }, (200,)),
+        'POST /api/resume-upload/batch (5 files)': ('POST', lambda i: {
+            'path': '/api/resume-upload/batch', 'headers': h,
+            'files': [('pdfs', f'batch-{i}-{j}.pdf', makePdf(2, seed=20_000 + 5 * i + j)) for j in range(5)],
+            'form': {'categoryId': str(category[1])}
+        }, (200,)),
+        'GET /api/categories': ('GET', lambda i: {'path': '/api/categories', 'headers': h}, (200,)),
+        'POST /api/categories': ('POST', lambda i: {
+            'path': '/api/categories', 'headers': h, 'json': {'name': f"bench-{fx.run_id}-{i}"}
+        }, (201,)),
+        'GET /api/categories/<id>': ('GET', lambda i: {'path': f'/api/categories/{category[0]}', 'headers': h}, (200,)),
+        'PUT /api/categories/<id>': ('PUT', lambda i: {
+            'path': f'/api/categories/{category[2]}', 'headers': h, 'json': {'name': f"renamed-{fx.run_id}-{i}"}
+        }, (200,)),
+        'DELETE /api/categories/<id>': ('DELETE', lambda i: {
+            'path': f"/api/categories/{fx.db.createCategory(USER_ID, f'doomed-{fx.run_id}-{i}').data[0]['id']}",
+            'headers': h
+        }, (200,)),
+        'GET /api/categories/<id>/resumes': ('GET', lambda i: {
+            'path': f'/api/categories/{category[0]}/resumes', 'headers': h
+        }, (200,)),
+        'GET /api/categories/all/resumes': ('GET', lambda i: {'path': '/api/categories/all/resumes', 'headers': h}, (200,)),
+        'DELETE /api/resumes/<id>': ('DELETE', lambda i: {
+            'path': f'/api/resumes/{fx.insertResumes(1)[0]}', 'headers': h
+        }, (200,)),
+        'PUT /api/resumes/<id>/move': ('PUT', lambda i: {
+            'path': f'/api/resumes/{resume_ids[i % len(resume_ids)]}/move', 'headers': h,
+            'json': {'categoryId': category[i % 2]}
+        }, (200,)),
+        'POST /api/resumes/bulk-delete (10 ids)': ('POST', lambda i: {
+            'path': '/api/resumes/bulk-delete', 'headers': h, 'json': {'ids': fx.insertResumes(10)}
+        }, (200,)),
+        'POST /api/resumes/bulk-move (10 ids)': ('POST', lambda i: {
+            'path': '/api/resumes/bulk-move', 'headers': h, 'json': {'ids': resume_ids[:10], 'categoryId': category[i % 2]}
+        }, (200,)),
+        'GET /api/get-user-resume-names': ('GET', lambda i: {'path': '/api/get-user-resume-names', 'headers': h}, (200,)),
+        'POST /api/job-description': ('POST', lambda i: {
+            'path': '/api/job-description', 'headers': h, 'json': jobDescription('analyze', i)
+        }, (200,)),
+        'POST /api/job-description/rank': ('POST', lambda i: {
+            'path': '/api/job-description/rank', 'headers': h, 'json': jobDescription('rank', i)
+        }, (200,)),
+        'POST /api/job-description/keywords': ('POST', lambda i: {
+            'path': '/api/job-description/keywords', 'headers': h, 'json': jobDescription('keywords', i)
+        }, (200,)),
+        'POST /api/job-description/stream': ('POST', lambda i: {
+            'path': '/api/job-description/stream', 'headers': h, 'json': jobDescription('stream', i)
+        }, (200,)),
+        'POST /api/job-description/jobs': ('POST', lambda i: {
+            'path': '/api/job-description/jobs', 'headers': h, 'json': jobDescription('jobs', i)
+        }, (202,)),
+        'GET /api/job-description/jobs/<id>': ('GET', lambda i: {
+            'path': f'/api/job-description/jobs/{fx.finishedJob()}', 'headers': h
+        }, (200,)),
+    }
+
+def runScenario(sender, method, prepare, expected, n, concurrency):
+    # Fixtures are made up front so only the requests themselves are timed
+    prepared = [prepare(i) for i in range(n)]
+
+    def one(kwargs):
+        path = kwargs.pop('path')
+        headers = kwargs.pop('headers', {})
+        start = time.perf_counter()
+        status = sender.send(method, path, headers, **kwargs)
+        return time.perf_counter() - start, status
+
+    wall_start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(one, prepared))
+    else:
+        outcomes = [one(kwargs) for kwargs in prepared]
+    wall = time.perf_counter() - wall_start
+
+    statuses = {}
+    for _, status in outcomes:
+        statuses[status] = statuses.get(status, 0) + 1
+    errors = sum(count for status, count in statuses.items() if status not in expected)
+    return summarize([d for d, _ in outcomes], wall, statuses, errors)
+
+def benchPdfExtraction(page_counts, iterations):
+    from jobmatch import extractPdf
+
+    results = {}
+    for pages in page_counts:
+        pdf = makePdf(pages, seed=pages)
+        extractPdf(pdf)
+        durations = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            text, page_count, truncated = extractPdf(pdf)
+            durations.append(time.perf_counter() - start)
+        assert page_count == pages and text and not truncated
+        total = sum(durations)
+        results[f"{pages} pages"] = {
+            'pages': pages,
+            'bytes': len(pdf),
+            'iterations': iterations,
+            'p50_ms': percentile(sorted(durations), 50) * 1e3,
+            'docs_per_s': iterations / total,
+            'pages_per_s': iterations * pages / total,
+            'mb_per_s': iterations * len(pdf) / total / 1e6
+        }
+    return results
+
+def benchStartup(runs, workdir, token):
+    """Median cold-start timings over `runs` fresh processes, see bench/startup.py."""
+    samples = []
+    for run in range(runs):
+        env = dict(os.environ, BENCH_TOKEN=token, SERVER_TIMING='0')
+        # A new database and job store each time, so nothing is warm from the previous run
+        env.update({
+            'LOCAL_DB_PATH': os.path.join(workdir, f'startup-{run}', 'local.sqlite3'),
+            'LOCAL_STORAGE_DIR': os.path.join(workdir, f'startup-{run}', 'storage'),
+            'JOB_DB': os.path.join(workdir, f'startup-{run}', 'jobs.sqlite3')
+        })
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, '-m', 'bench.startup'], cwd=SERVER_DIR, env=env,
+                                   capture_output=True, text=True, timeout=120)
+        process_ms = (time.perf_counter() - start) * 1e3
+        if completed.returncode != 0:
+            raise RuntimeError(f"startup run failed:\n{completed.stderr}")
+        sample = json.loads(completed.stdout.strip().splitlines()[-1])
+        sample['process_ms'] = process_ms
+        samples.append(sample)
+
+    summary = {'runs': runs, 'sdks_loaded_at_startup': samples[-1]['sdks_loaded_at_startup'],
+               'errors': sorted({e for s in samples for e in s.get('errors', [])})}
+    for key in STARTUP_TIMINGS:
+        summary[key] = percentile(sorted(s[key] for s in samples), 50)
+    return summary
+
+def staticFolder(app, workdir):
+    """The built client if there is one, otherwise a generated index.html and 256 KB bundle."""
+    assets = os.path.join(app.static_folder or '', 'assets')
+    if os.path.exists(os.path.join(app.static_folder or '', 'index.html')) and os.path.isdir(assets) and os.listdir(assets):
+        return '/assets/' + sorted(os.listdir(assets))[0]
+    folder = os.path.join(workdir, 'static')
+    os.makedirs(os.path.join(folder, 'assets'), exist_ok=True)
+    with open(os.path.join(folder, 'index.html'), 'w') as f:
+        f.write('<!doctype html><html><head><script type="module" src="/assets/bench.js"></script></head>'
+                '<body><div id="root"></div></body></html>')
+    with open(os.path.join(folder, 'assets', 'bench.js'), 'w') as f:
+        f.write(('console.log("resumevc bench bundle");\n' * 7000)[:256 * 1024])
+    precompress(folder)
+    app.static_folder = folder
+    return '/assets/bench.js'
+
+def gitCommit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('meta', {}).get('commit')}):")
+    old_args = baseline.get('meta', {}).get('args', {})
+    new_args = results['meta']['args']
+    for setting in ('mode', 'concurrency', 'db_latency', 'storage_latency', 'llm_latency', 'jwks_latency'):
+        if old_args.get(setting) != new_args.get(setting):
+            print(f"  warning: {setting} differs ({old_args.get(setting)} -> {new_args.get(setting)})")
+    regressions = 0
+    for name, current in results['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(name)
+        if not before or not before['p95_ms']:
+            continue
+        p50_change = current['p50_ms'] / before['p50_ms'] - 1 if before['p50_ms'] else 0.0
+        p95_change = current['p95_ms'] / before['p95_ms'] - 1
+        flag = ''
+        if p95_change > threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"  {name:<44} p50 {p50_change:+7.1%}  p95 {p95_change:+7.1%}{flag}")
+
+    startup, before = results.get('startup'), baseline.get('startup')
+    if startup and before:
+        for key in ('import_ms', 'create_app_ms', 'first_request_ms', 'first_auth_db_ms'):
+            if not before.get(key):
+                continue
+            change = startup[key] / before[key] - 1
+            flag = ''
+            if change > threshold:
+                flag = '  REGRESSION'
+                regressions += 1
+            print(f"  {'startup ' + key:<44} median {change:+7.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=50, help='requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=1, help='requests in flight per endpoint')
+    parser.add_argument('--mode', choices=('client', 'wsgi'), default='client')
+    parser.add_argument('--only', default=None, help='only endpoints whose name contains this text')
+    parser.add_argument('--resumes', type=int, default=20, help='resumes seeded for the benchmark user')
+    parser.add_argument('--db-latency', type=float, default=0.002, help='seconds per database statement')
+    parser.add_argument('--storage-latency', type=float, default=0.01, help='seconds per storage call')
+    parser.add_argument('--llm-latency', type=float, default=0.05, help='seconds before each LLM response')
+    parser.add_argument('--token-latency', type=float, default=0.0, help='seconds between streamed tokens')
+    parser.add_argument('--jwks-latency', type=float, default=0.02, help='seconds per Clerk API call')
+    parser.add_argument('--pdf-pages', default='1,2,5,10,25', help='page counts for the extraction benchmark')
+    parser.add_argument('--pdf-iterations', type=int, default=20)
+    parser.add_argument('--startup-runs', type=int, default=5, help='fresh processes timed for cold start, 0 to skip')
+    parser.add_argument('--output', default='bench-results.json')
+    parser.add_argument('--compare', default=None, help='earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='p95 increase counted as a regression')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='resumevc-bench-')
+    clerk = FakeClerk(latency=args.jwks_latency).start()
+    llm = FakeLLM(latency=args.llm_latency, token_latency=args.token_latency).start()
+
+    # Everything the app reads at import time points at the fakes and the scratch directory
+    os.environ.update({
+        'CLERK_SECRET_KEY': 'sk_test_bench',
+        'CLERK_API_URL': clerk.url,
+        'GEMINI_API_KEY': 'bench',
+        'LLM_BASE_URL': llm.url + '/v1/',
+        'DATA_BACKEND': 'local',
+        'LOCAL_DB_PATH': os.path.join(workdir, 'unused.sqlite3'),
+        'LOCAL_STORAGE_DIR': os.path.join(workdir, 'unused-storage'),
+        'JOB_DB': os.path.join(workdir, 'jobs.sqlite3'),
+        'TEXT_CACHE_DIR': os.path.join(workdir, 'text'),
+        'MATCH_CACHE_DB': '',
+        'ANALYSIS_QUEUE_SIZE': str(max(1024, args.requests * 2)),
+        # Every request comes from one user, which per-user admission control would throttle
+        'ANALYZE_RATE': '0',
+        'ANALYZE_CONCURRENCY': '0',
+        'UPLOAD_RATE': '0',
+        'UPLOAD_CONCURRENCY': '0'
+    })
+    import app as app_module
+    import database
+
+    fake_db = FakeSupabase(os.path.join(workdir, 'supabase'), latency=args.db_latency,
+                           storage_latency=args.storage_latency)
+    database.setSupabase(fake_db)
+    database.setAsyncSupabase(AsyncFakeSupabase(fake_db))
+
+    app = app_module.create_app()
+    static_asset = staticFolder(app, workdir)
+    app_module.loadStaticFiles(app)
+    sender = WsgiSender(app) if args.mode == 'wsgi' else TestClientSender(app)
+    if args.mode == 'wsgi':
+        fake_db.storage.public_url = sender.url + '/api/local-storage'
+
+    fixtures = Fixtures(clerk, app_module, app, database)
+    fixtures.seed(sender, args.resumes)
+    scenarios = buildScenarios(fixtures, static_asset)
+
+    results = {
+        'meta': {
+            'commit': gitCommit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'args': vars(args)
+        },
+        'endpoints': {},
+        'pdf_extraction': {},
+        'startup': {}
+    }
+
+    print(f"{'endpoint':<44} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'errors':>7}")
+    for name, (method, prepare, expected) in scenarios.items():
+        if args.only and args.only not in name:
+            continue
+        summary = runScenario(sender, method, prepare, expected, args.requests, args.concurrency)
+        results['endpoints'][name] = summary
+        print(f"{name:<44} {summary['p50_ms']:>9.2f} {summary['p95_ms']:>9.2f} {summary['p99_ms']:>9.2f} "
+              f"{summary['rps']:>9.1f} {summary['errors']:>7}")
+        if name.startswith('POST /api/job-description/jobs'):
+            # Let queued analyses finish so they don't load the endpoints measured after them
+            while app_module.getAnalysisQueue().pending():
+                time.sleep(0.05)
+
+    page_counts = [int(p) for p in args.pdf_pages.split(',') if p.strip()]
+    results['pdf_extraction'] = benchPdfExtraction(page_counts, args.pdf_iterations)
+    print(f"\n{'pdf extraction':<20} {'bytes':>9} {'p50 ms':>9} {'docs/s':>9} {'pages/s':>9} {'MB/s':>7}")
+    for name, r in results['pdf_extraction'].items():
+        print(f"{name:<20} {r['bytes']:>9} {r['p50_ms']:>9.2f} {r['docs_per_s']:>9.1f} "
+              f"{r['pages_per_s']:>9.1f} {r['mb_per_s']:>7.2f}")
+
+    if args.startup_runs:
+        startup = results['startup'] = benchStartup(args.startup_runs, workdir, fixtures.token)
+        print(f"\ncold start (median of {startup['runs']} processes)")
+        for key in STARTUP_TIMINGS:
+            print(f"  {key:<24} {startup[key]:>9.1f}")
+        print(f"  SDKs loaded by create_app(): {', '.join(startup['sdks_loaded_at_startup']) or 'none'}")
+        for error in startup['errors']:
+            print(f"  error: {error}")
+
+    sender.close()
+    clerk.stop()
+    llm.stop()
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        if compare(results, args.compare, args.threshold):
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
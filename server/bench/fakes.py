@@ -0,0 +1,272 @@
+"""Local stand-ins for the hosted services the server talks to.
+
+Each HTTP fake runs a server on a random localhost port in a daemon thread,
+so benchmarks (and anything else that wants it) can run fully offline.
+FakeSupabase is in-process instead: the local SQLite backend plus latency,
+with AsyncFakeSupabase as its counterpart for the async views.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+from localbackend import AsyncLocalClient, AsyncStatement, LocalBucket, LocalClient, LocalStorage
+
+class FakeServer:
+    """Base class: subclasses implement handle(handler) for every request."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.requests = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fake._dispatch(self)
+
+            def do_POST(self):
+                fake._dispatch(self)
+
+            def do_PUT(self):
+                fake._dispatch(self)
+
+            def do_PATCH(self):
+                fake._dispatch(self)
+
+            def do_DELETE(self):
+                fake._dispatch(self)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def _dispatch(self, handler):
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        self.handle(handler)
+
+    def handle(self, handler):
+        raise NotImplementedError
+
+    def sendJson(self, handler, body, status=200, headers=None):
+        payload = json.dumps(body).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+class FakeClerk(FakeServer):
+    """Serves /v1/jwks like Clerk's Backend API and mints matching session tokens."""
+
+    def __init__(self, latency=0.0):
+        super().__init__(latency)
+        self.keys = {}
+        self.rotate()
+
+    def rotate(self):
+        """Add a new signing key; tokens minted afterwards use it."""
+        self.kid = f"ins_{uuid.uuid4().hex[:12]}"
+        self.keys[self.kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        return self.kid
+
+    def mintToken(self, sub='user_bench', azp='http://localhost:5173', ttl=60):
+        now = int(time.time())
+        claims = {'sub': sub, 'azp': azp, 'iat': now, 'nbf': now, 'exp': now + ttl, 'sid': uuid.uuid4().hex}
+        return jwt.encode(claims, self.keys[self.kid], algorithm='RS256', headers={'kid': self.kid})
+
+    def handle(self, handler):
+        path = handler.path.split('?')[0]
+        if handler.command == 'PATCH' and path.startswith('/v1/users/') and path.endswith('/metadata'):
+            # users.update_metadata, as called when onboarding completes
+            length = int(handler.headers.get('Content-Length') or 0)
+            body = json.loads(handler.rfile.read(length) or b'{}')
+            user_id = path[len('/v1/users/'):-len('/metadata')]
+            return self.sendJson(handler, {'object': 'user', 'id': user_id, **body})
+        if path != '/v1/jwks':
+            return self.sendJson(handler, {'errors': [{'message': 'not found'}]}, 404)
+        jwks = []
+        for kid, key in self.keys.items():
+            jwk = json.loads(RSAAlgorithm.to_jwk(key.public_key()))
+            jwk.update({'kid': kid, 'use': 'sig', 'alg': 'RS256'})
+            jwks.append(jwk)
+        self.sendJson(handler, {'keys': jwks})
+
+class FakeLLM(FakeServer):
+    """OpenAI-compatible /chat/completions endpoint with injectable latency and errors.
+
+    `error_rate` fails that fraction of requests with `error_status`; `failNext(n)`
+    fails exactly the next n requests. Streaming requests get one SSE chunk per
+    word, `token_latency` apart. Replies contain a match percentage so
+    parseMatchScore has something to find.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, error_status=503, retry_after=None, reply=None, seed=0,
+                 token_latency=0.0):
+        super().__init__(latency)
+        self.token_latency = token_latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.reply = reply
+        self.rng = __import__('random').Random(seed)
+        self._fail_next = 0
+        self._lock = threading.Lock()
+
+    def failNext(self, n, status=None):
+        with self._lock:
+            self._fail_next = n
+            if status is not None:
+                self.error_status = status
+
+    def _shouldFail(self):
+        with self._lock:
+            if self._fail_next > 0:
+                self._fail_next -= 1
+                return True
+            return self.rng.random() < self.error_rate
+
+    def completionText(self, body):
+        if self.reply is not None:
+            return self.reply
+        content = body['messages'][-1]['content'] if body.get('messages') else ''
+        return f"Match: {len(content) % 101}%. Keywords in common were found. This is a stand-in reply."
+
+    def handle(self, handler):
+        length = int(handler.headers.get('Content-Length') or 0)
+        body = json.loads(handler.rfile.read(length) or b'{}')
+        if not handler.path.rstrip('/').endswith('/chat/completions'):
+            return self.sendJson(handler, {'error': {'message': 'not found'}}, 404)
+        if self._shouldFail():
+            headers = {'Retry-After': str(self.retry_after)} if self.retry_after is not None else None
+            return self.sendJson(handler, {'error': {'message': 'injected failure'}}, self.error_status, headers)
+
+        text = self.completionText(body)
+        if body.get('stream'):
+            return self.streamCompletion(handler, body, text)
+        self.sendJson(handler, {
+            'id': f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'fake'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+        })
+
+    def streamCompletion(self, handler, body, text):
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/event-stream')
+        handler.send_header('Connection', 'close')
+        handler.end_headers()
+        handler.close_connection = True
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        words = text.split(' ')
+        for i, word in enumerate(words):
+            if i and self.token_latency:
+                time.sleep(self.token_latency)
+            chunk = {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': body.get('model', 'fake'),
+                'choices': [{'index': 0, 'delta': {'content': word if i == 0 else ' ' + word}, 'finish_reason': None}]
+            }
+            handler.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            handler.wfile.flush()
+        handler.wfile.write(b"data: [DONE]\n\n")
+        handler.wfile.flush()
+
+class DelayedBucket(LocalBucket):
+    def upload(self, path, file, file_options=None):
+        time.sleep(self.storage.latency)
+        return super().upload(path, file, file_options)
+
+    def remove(self, paths):
+        time.sleep(self.storage.latency)
+        return super().remove(paths)
+
+class DelayedStorage(LocalStorage):
+    def __init__(self, directory, public_url, latency):
+        super().__init__(directory, public_url)
+        self.latency = latency
+
+    def from_(self, bucket):
+        return DelayedBucket(self, bucket)
+
+class FakeSupabase(LocalClient):
+    """LocalClient that waits `latency` seconds per statement and `storage_latency`
+    per storage call, standing in for the round trips to hosted Supabase."""
+
+    def __init__(self, directory, latency=0.0, storage_latency=0.0,
+                 public_url='http://127.0.0.1:5000/api/local-storage'):
+        super().__init__(os.path.join(directory, 'db.sqlite3'), os.path.join(directory, 'storage'), public_url)
+        self.latency = latency
+        self.storage = DelayedStorage(os.path.join(directory, 'storage'), public_url, storage_latency)
+
+    def _delayed(self, statement):
+        execute = statement.execute
+
+        def delayedExecute():
+            time.sleep(self.latency)
+            return execute()
+        statement.execute = delayedExecute
+        return statement
+
+    def table(self, name):
+        return self._delayed(super().table(name))
+
+    from_ = table
+
+    def rpc(self, name, params=None):
+        return self._delayed(super().rpc(name, params))
+
+class AsyncDelayedStatement(AsyncStatement):
+    def __init__(self, statement, latency):
+        super().__init__(statement)
+        self.latency = latency
+
+    async def execute(self):
+        await asyncio.sleep(self.latency)
+        return await super().execute()
+
+class AsyncFakeSupabase(AsyncLocalClient):
+    """The database of a FakeSupabase for the async views, with the same latency awaited rather than slept."""
+
+    def _wrap(self, statement):
+        return AsyncDelayedStatement(statement, self.client.latency)
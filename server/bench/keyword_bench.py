@@ -0,0 +1,56 @@
+"""Benchmark of the offline BM25 pre-ranker over a synthetic resume corpus.
+
+Run from server/:  python -m bench.keyword_bench [--resumes N] [--queries N]
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from jobmatch import KeywordIndex
+
+SKILLS = """python java javascript typescript react node.js flask django sql postgresql mongodb aws gcp azure docker
+kubernetes terraform c++ c# go rust swift kotlin pandas numpy pytorch tensorflow spark hadoop kafka redis graphql
+rest microservices ci/cd git linux agile scrum figma excel tableau salesforce seo marketing accounting nursing""".split()
+FILLER = """led built designed improved managed developed delivered launched reduced increased team project customers
+platform service pipeline analysis reporting stakeholders performance system data product users revenue quality""".split()
+
+def synthResume(rng, words=400):
+    skills = rng.sample(SKILLS, 8)
+    tokens = [rng.choice(skills) if rng.random() < 0.15 else rng.choice(FILLER) for _ in range(words)]
+    tokens += [f"term{rng.randrange(20000)}" for _ in range(words // 4)]
+    return " ".join(tokens)
+
+def synthJobDescription(rng):
+    return " ".join(rng.sample(SKILLS, 6) + rng.sample(FILLER, 20))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--resumes', type=int, default=5000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = [(i, synthResume(rng)) for i in range(args.resumes)]
+    queries = [synthJobDescription(rng) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    index = KeywordIndex(corpus)
+    build = time.perf_counter() - start
+
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.rank(query, top_k=10)
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings) * 1000
+
+    print(f"corpus: {len(index)} resumes, {len(index.vocab)} terms, {len(index.post_docs)} postings")
+    print(f"index build: {build * 1000:.1f} ms")
+    print(f"query: p50 {np.percentile(timings, 50):.2f} ms, p95 {np.percentile(timings, 95):.2f} ms, "
+          f"max {timings.max():.2f} ms over {len(timings)} job descriptions")
+
+if __name__ == '__main__':
+    main()
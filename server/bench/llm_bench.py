@@ -0,0 +1,82 @@
+"""Exercise the shared LLM client against a local fake OpenAI-compatible server.
+
+Compares a fresh OpenAI client per call (the old behaviour) with the pooled
+LLMClient, then shows retries absorbing injected errors, the circuit
+breaker failing fast during an outage, and time to first token when streaming.
+
+Run from server/:  python -m bench.llm_bench [--calls N] [--latency SECONDS] [--error-rate R]
+"""
+import argparse
+import time
+
+from openai import OpenAI
+
+from bench.fakes import FakeLLM
+from llmclient import CircuitBreaker, CircuitOpenError, LLMClient
+
+MESSAGES = [{'role': 'user', 'content': 'Here is the job description: python\n Here is the resume in text form: python'}]
+
+def timeCalls(call, n):
+    ok = failed = 0
+    start = time.perf_counter()
+    for _ in range(n):
+        try:
+            call()
+            ok += 1
+        except Exception:
+            failed += 1
+    return (time.perf_counter() - start) / n, ok, failed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.005)
+    parser.add_argument('--error-rate', type=float, default=0.2)
+    parser.add_argument('--token-latency', type=float, default=0.02)
+    args = parser.parse_args()
+
+    with FakeLLM(latency=args.latency) as llm:
+        base_url = llm.url + '/v1/'
+
+        def perCallClient():
+            client = OpenAI(api_key='fake', base_url=base_url, max_retries=0)
+            return client.chat.completions.create(model='fake', messages=MESSAGES)
+        per_call, _, _ = timeCalls(perCallClient, args.calls)
+
+        pooled = LLMClient('fake', base_url=base_url)
+        shared, _, _ = timeCalls(lambda: pooled.chat('fake', MESSAGES), args.calls)
+        print(f"new client per call   {per_call * 1000:8.2f} ms/call")
+        print(f"shared pooled client  {shared * 1000:8.2f} ms/call")
+
+        llm.error_rate = args.error_rate
+        flaky = LLMClient('fake', base_url=base_url, backoff_base=0.01, backoff_cap=0.05)
+        avg, ok, failed = timeCalls(lambda: flaky.chat('fake', MESSAGES), args.calls)
+        print(f"{args.error_rate:.0%} injected 503s: {ok} ok, {failed} failed, {avg * 1000:.2f} ms/call, stats {flaky.stats}")
+
+        llm.error_rate = 1.0
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        outage = LLMClient('fake', base_url=base_url, max_retries=1, backoff_base=0.01, backoff_cap=0.05, breaker=breaker)
+        avg, ok, failed = timeCalls(lambda: outage.chat('fake', MESSAGES), args.calls)
+        print(f"full outage: {failed} failed, {avg * 1000:.3f} ms/call, breaker {breaker.state}, stats {outage.stats}")
+        try:
+            outage.chat('fake', MESSAGES)
+        except CircuitOpenError as e:
+            print(f"next call fails fast: {e}")
+
+    with FakeLLM(latency=args.latency, token_latency=args.token_latency) as llm:
+        client = LLMClient('fake', base_url=llm.url + '/v1/')
+        start = time.perf_counter()
+        client.chat('fake', MESSAGES)
+        blocking = time.perf_counter() - start
+
+        start = time.perf_counter()
+        first = None
+        for _ in client.chatStream('fake', MESSAGES):
+            if first is None:
+                first = time.perf_counter() - start
+        streamed = time.perf_counter() - start
+        print(f"blocking completion: {blocking * 1000:.1f} ms until any output")
+        print(f"streamed completion: first token {first * 1000:.1f} ms, complete {streamed * 1000:.1f} ms")
+
+if __name__ == '__main__':
+    main()
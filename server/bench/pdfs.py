@@ -0,0 +1,43 @@
+"""Generated resume-like PDFs for benchmarks, built by hand so no PDF writer is needed."""
+import random
+
+WORDS = (
+    "python java typescript react flask postgres sql docker kubernetes aws gcp linux git "
+    "designed built led shipped improved reduced latency throughput reliability scaled migrated "
+    "team customers platform service pipeline api backend frontend testing monitoring on-call "
+    "engineer intern university project analytics dashboard payments search caching queue"
+).split()
+
+def pageText(rng, lines):
+    return [' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 14))) for _ in range(lines)]
+
+def makePdf(pages=1, lines_per_page=40, seed=0, title='Bench Resume'):
+    """A valid PDF with `pages` pages of Helvetica text, `lines_per_page` lines each."""
+    rng = random.Random(seed)
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = ' '.join(f"{3 + 2 * i} 0 R" for i in range(pages))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>")
+    font = 3 + 2 * pages
+
+    for i in range(pages):
+        lines = [f"{title} page {i + 1}"] + pageText(rng, lines_per_page)
+        body = ' '.join(f"({line}) Tj T*" for line in lines)
+        stream = f"BT /F1 10 Tf 12 TL 54 750 Td {body} ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{obj}\nendobj\n".encode('latin-1')
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
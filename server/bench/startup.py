@@ -0,0 +1,51 @@
+"""Cold-start timings of one fresh process, printed as one line of JSON.
+
+Run by endpoint_bench.py in a subprocess (from server/, with its fakes in the
+environment): importing app, create_app(), the first request, the first
+authenticated database request and creating the LLM client.
+
+BENCH_TOKEN must hold a session token the configured Clerk accepts.
+"""
+import json
+import os
+import sys
+import time
+
+SDKS = ('supabase', 'clerk_backend_api', 'openai')
+
+def elapsedMs(start):
+    return (time.perf_counter() - start) * 1e3
+
+def main():
+    start = time.perf_counter()
+    import app as app_module
+    timings = {'import_ms': elapsedMs(start)}
+
+    start = time.perf_counter()
+    app = app_module.create_app()
+    timings['create_app_ms'] = elapsedMs(start)
+    # Should stay empty: every SDK is meant to load on first use
+    timings['sdks_loaded_at_startup'] = [name for name in SDKS if name in sys.modules]
+
+    client = app.test_client()
+    headers = {'Authorization': f"Bearer {os.environ['BENCH_TOKEN']}"}
+    for name, path, request_headers in (
+        ('first_request_ms', '/api/hello', {}),
+        ('first_auth_db_ms', '/api/categories', headers),
+        ('warm_auth_db_ms', '/api/categories', headers)
+    ):
+        start = time.perf_counter()
+        status = client.get(path, headers=request_headers).status_code
+        timings[name] = elapsedMs(start)
+        if status >= 500:
+            timings.setdefault('errors', []).append(f"{path}: {status}")
+
+    from llmclient import getLLMClient
+    start = time.perf_counter()
+    getLLMClient()
+    timings['first_llm_client_ms'] = elapsedMs(start)
+
+    print(json.dumps(timings))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from collections import namedtuple
+from urllib.parse import unquote, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+Blob = namedtuple('Blob', ['path', 'sha256', 'size'])
+
+SAFE_NAME_RE = re.compile(r'^[A-Za-z0-9._-]{1,128}$')
+CHUNK_SIZE = 64 * 1024
+
+def objectName(url):
+    """Storage object name at the end of a public storage URL."""
+    return unquote(urlsplit(url).path.rsplit('/', 1)[-1])
+
+class BlobMirror:
+    """On-disk copy of resume PDFs, keyed by storage object name.
+
+    A lookup always asks the origin first, but with the stored ETag in
+    If-None-Match, so an unchanged object costs a 304 rather than the body.
+    Bodies are streamed to a temporary file (hashing as they arrive) and renamed
+    into place, so callers get a path they can memory-map instead of a copy of
+    the bytes. Total size is bounded; least recently used files go first.
+    """
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024, pool_size=10, timeout=(5, 60)):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.stats = {'revalidated': 0, 'downloads': 0, 'downloaded_bytes': 0, 'evictions': 0, 'deletes': 0}
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._bytes = sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.name.endswith('.blob'))
+
+    def _key(self, name):
+        # Pre-content-hash objects are named after the upload, which may not be a safe filename
+        if SAFE_NAME_RE.match(name) and not name.startswith('.'):
+            return name
+        return hashlib.sha256(name.encode('utf-8')).hexdigest()
+
+    def _paths(self, name):
+        base = os.path.join(self.directory, self._key(name))
+        return base + '.blob', base + '.json'
+
+    def _readMeta(self, meta_path):
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def fetch(self, url):
+        """Blob(path, sha256, size) for the object at `url`, downloading it only if it changed."""
+        path, meta_path = self._paths(objectName(url))
+        meta = self._readMeta(meta_path)
+        headers = {}
+        if meta and meta.get('etag') and os.path.exists(path):
+            headers['If-None-Match'] = meta['etag']
+
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 304:
+                try:
+                    os.utime(path)  # Mark as recently used for eviction
+                except FileNotFoundError:
+                    return self.fetch(url)  # Evicted since the check, download it
+                self.stats['revalidated'] += 1
+                return Blob(path, meta['sha256'], meta['size'])
+
+            response.raise_for_status()
+            digest = hashlib.sha256()
+            size = 0
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+            etag = response.headers.get('ETag')
+
+        meta = {'etag': etag, 'sha256': digest.hexdigest(), 'size': size}
+        with self._lock:
+            if os.path.exists(path):
+                self._bytes -= os.path.getsize(path)
+            # Rename into place so a concurrent reader never sees a half-written file
+            os.replace(tmp_path, path)
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            self._bytes += size
+            self.stats['downloads'] += 1
+            self.stats['downloaded_bytes'] += size
+            self._evict(keep=path)
+        return Blob(path, meta['sha256'], size)
+
+    def delete(self, name):
+        """Drop the local copy of storage object `name`, if there is one."""
+        path, meta_path = self._paths(name)
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                self._bytes -= size
+                self.stats['deletes'] += 1
+            except FileNotFoundError:
+                pass
+            try:
+                os.remove(meta_path)
+            except FileNotFoundError:
+                pass
+
+    def _evict(self, keep):
+        if self._bytes <= self.max_bytes:
+            return
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith('.blob')),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in entries:
+            if self._bytes <= self.max_bytes:
+                break
+            if entry.path == keep:
+                continue
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                print(f"[BlobMirror] Could not evict {entry.name}: {e}", file=sys.stderr)
+                continue
+            self._bytes -= size
+            self.stats['evictions'] += 1
+            try:
+                os.remove(entry.path[:-len('.blob')] + '.json')
+            except FileNotFoundError:
+                pass
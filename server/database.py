@@ -1,53 +1,158 @@
 from datetime import date
+import asyncio
 import os
-from dotenv import load_dotenv
-from supabase import create_client, Client
 import datetime
 import sys
+import threading
+import io
+import hashlib
+import importlib
+import base64
+import re
+from io import BufferedReader
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-load_dotenv()
-url: str = os.environ.get("SUPABASE_URL")
-key: str = os.environ.get("SUPABASE_KEY")
-supabase: Client = create_client(url, key)
+from jobmatch import extractPdf, textCache, urlCacheKey, blobMirror
+from usercache import UserCache
+from metrics import timed
+
+# "supabase" (default) or "local" for SQLite + filesystem storage on this machine, see localbackend.py
+DATA_BACKEND = (os.environ.get("DATA_BACKEND") or "supabase").lower()
+
+def createDataClient():
+    if DATA_BACKEND == 'local':
+        from localbackend import LocalClient
+        return LocalClient(
+            db_path=os.environ.get("LOCAL_DB_PATH") or "/tmp/resumevc/local.sqlite3",
+            storage_dir=os.environ.get("LOCAL_STORAGE_DIR") or "/tmp/resumevc/storage",
+            public_url=os.environ.get("LOCAL_STORAGE_URL") or "http://127.0.0.1:5000/api/local-storage"
+        )
+    # The SDK takes about half a second to import, so it's only loaded when the client is first needed
+    from supabase import create_client
+    return create_client(os.environ.get("SUPABASE_URL"), os.environ.get("SUPABASE_KEY"))
+
+_supabase = None
+_supabase_lock = threading.Lock()
+
+def getSupabase():
+    """The process-wide data client, created on first use."""
+    global _supabase
+    if _supabase is None:
+        with _supabase_lock:
+            if _supabase is None:
+                _supabase = createDataClient()
+    return _supabase
+
+def setSupabase(client):
+    """Use `client` instead of the configured backend (the benchmarks swap in a fake)."""
+    global _supabase
+    _supabase = client
+
+async def createAsyncDataClient():
+    # Importing the SDK (or opening the local database) blocks, so it happens on a worker thread, not the event loop
+    if DATA_BACKEND == 'local':
+        from localbackend import AsyncLocalClient
+        return AsyncLocalClient(await asyncio.to_thread(getSupabase))
+    supabase = await asyncio.to_thread(importlib.import_module, 'supabase')
+    return await supabase.acreate_client(os.environ.get("SUPABASE_URL"), os.environ.get("SUPABASE_KEY"))
+
+_async_supabase = None
+_async_supabase_lock = asyncio.Lock()
+
+async def getAsyncSupabase():
+    """The async data client for the async views, created on first use.
+
+    Only ever awaited on the shared event loop in aio.py, which its
+    connection pool is bound to.
+    """
+    global _async_supabase
+    if _async_supabase is None:
+        async with _async_supabase_lock:
+            if _async_supabase is None:
+                _async_supabase = await createAsyncDataClient()
+    return _async_supabase
+
+def setAsyncSupabase(client):
+    global _async_supabase
+    _async_supabase = client
+
+# Everything except the extracted text, which can be large and is only needed server-side
+RESUME_COLUMNS = 'id, clerk_id, category_id, name, link, date, created_at, updated_at, page_count, byte_size, content_hash'
+
+# Keyset pagination over (date, id), newest first
+RESUME_PAGE_SIZE = 50
+MAX_RESUME_PAGE_SIZE = 100
+CURSOR_RE = re.compile(r'^(\d{4}-\d{2}-\d{2})\|(\d+)$')
 
 class MockSupabaseResponse:
     def __init__(self, data, error=None):
         self.data = data
         self.error = error
 
+# Per-user cache of category and resume listings, invalidated by every write for that user.
+# Invalidation only reaches this process, so USER_CACHE_TTL=0 is required when running more than one.
+userCache = UserCache(
+    ttl=float(os.environ.get("USER_CACHE_TTL") or 30),
+    max_users=int(os.environ.get("USER_CACHE_SIZE") or 1024)
+)
+
+async def cachedReadAsync(user_id, key, fetch):
+    """Read-through for userCache around a coroutine `fetch`. Only successful responses are cached, as their data."""
+    cached = userCache.get(user_id, key)
+    if cached is not None:
+        return MockSupabaseResponse(data=cached)
+    generation = userCache.generation(user_id)
+    response = await fetch()
+    if not (hasattr(response, 'error') and response.error) and getattr(response, 'data', None) is not None:
+        userCache.put(user_id, key, response.data, generation)
+    return response
+
+@timed('db')
 def getUsers(user_id):
-    response = supabase.table('users').select('*').eq('clerk_id', user_id).execute()
+    response = getSupabase().table('users').select('*').eq('clerk_id', user_id).execute()
     return response
 
+@timed('db')
 def createUser(user_id, email, name):
-    supabase.table('users').insert({
+    getSupabase().table('users').insert({
         'clerk_id': user_id,
         'email': email,
         'name': name
     }).execute()
     return 1
 
+@timed('db')
 def deleteUser(user_id):
-    response = supabase.table('users').delete().eq('clerk_id', user_id).execute()
+    try:
+        response = getSupabase().table('users').delete().eq('clerk_id', user_id).execute()
+    finally:
+        userCache.invalidate(user_id)
     return response
 
-def getCategories(user_id):
-    response = supabase.table('categories').select('*').eq('clerk_id', user_id).execute()
-    return response
-    
+@timed('db')
 def createCategory(user_id, name):
-    response = supabase.table('categories').insert({
-        'clerk_id': user_id,
-        'name': name
-    }).execute()
+    try:
+        response = getSupabase().table('categories').insert({
+            'clerk_id': user_id,
+            'name': name
+        }).execute()
+    finally:
+        userCache.invalidate(user_id)
     return response
     
+@timed('db')
 def updateCategory(user_id, category_id, name):
-    response = supabase.table('categories').update({
-        'name': name
-    }).eq('id', category_id).eq('clerk_id', user_id).execute()
+    try:
+        response = getSupabase().table('categories').update({
+            'name': name
+        }).eq('id', category_id).eq('clerk_id', user_id).execute()
+    finally:
+        userCache.invalidate(user_id)
     return response
     
+@timed('db')
 def deleteCategory(user_id, category_id):
     # The FOREIGN KEY constraint `ON DELETE SET NULL` on `resumes.category_id`
     # will automatically set the category_id to NULL for associated resumes
@@ -55,153 +160,506 @@ def deleteCategory(user_id, category_id):
     # 'Uncategorized' category is no longer needed and has been removed.
     
     # Delete the category
-    response = supabase.table('categories').delete()\
-        .eq('id', category_id)\
-        .eq('clerk_id', user_id)\
-        .execute()
+    try:
+        response = getSupabase().table('categories').delete()\
+            .eq('id', category_id)\
+            .eq('clerk_id', user_id)\
+            .execute()
+    finally:
+        userCache.invalidate(user_id)
     return response
 
-def getResumesByCategory(user_id, category_id=None):
-    query = supabase.table('resumes').select('*').eq('clerk_id', user_id)
-    if category_id:
-        query = query.eq('category_id', category_id)
-    response = query.execute()
-    return response
+def encodeCursor(row):
+    return base64.urlsafe_b64encode(f"{row['date']}|{row['id']}".encode()).decode()
 
-def getResumesForUser(user_id):
+def decodeCursor(cursor):
+    """Return (date, id) from a cursor, raising ValueError for anything malformed."""
     try:
-        # Fetch all resumes for the user, including those with null category_id
-        resumes_response = supabase.table('resumes') \
-            .select('*') \
-            .eq('clerk_id', user_id) \
-            .execute()
+        match = CURSOR_RE.match(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except Exception:
+        match = None
+    if not match:
+        raise ValueError('Invalid cursor')
+    return match.group(1), int(match.group(2))
 
-        if hasattr(resumes_response, 'error') and resumes_response.error:
-            # Propagate Supabase error if one occurs
-            return MockSupabaseResponse(data=None, error=resumes_response.error)
+def pageBounds(cursor, limit):
+    return max(1, min(int(limit), MAX_RESUME_PAGE_SIZE)), decodeCursor(cursor) if cursor else None
 
-        if not resumes_response.data:
-            return MockSupabaseResponse(data=[], error=None) # No resumes at all
+def resumesPageKey(category_id, columns, cursor, limit):
+    return f"resumes:{category_id or 'all'}:{columns}:{cursor}:{limit}"
 
-        resumeList = []
-        for resume in resumes_response.data:
-            resumeList.append(resume)
-
-        return resumeList
-    except Exception as e:
-        print(f"Error in getResumesForUser (Python-side aggregation): {e}", file=sys.stderr)
-        error_details = {'message': str(e), 'details': 'Python-side aggregation failed'}
-        return MockSupabaseResponse(data=None, error=error_details)
+def resumesPageQuery(client, user_id, category_id, columns, after, limit):
+    query = client.table('resumes').select(columns).eq('clerk_id', user_id)
+    if category_id:
+        query = query.eq('category_id', category_id)
+    if after:
+        after_date, after_id = after
+        query = query.or_(f"date.lt.{after_date},and(date.eq.{after_date},id.lt.{after_id})")
+    # One extra row tells us whether there is another page
+    return query.order('date', desc=True).order('id', desc=True).limit(limit + 1)
 
-def getResumesCount(user_id):
-    """Get count of resumes grouped by category using Python-side aggregation."""
-    try:
-        # Fetch all resumes for the user, including those with null category_id
-        resumes_response = supabase.table('resumes') \
-            .select('id, category_id') \
-            .eq('clerk_id', user_id) \
-            .execute()
+def resumesPage(response, limit):
+    if hasattr(response, 'error') and response.error:
+        return MockSupabaseResponse(data=None, error=response.error)
 
-        if hasattr(resumes_response, 'error') and resumes_response.error:
-            # Propagate Supabase error if one occurs
-            return MockSupabaseResponse(data=None, error=resumes_response.error)
+    rows = response.data or []
+    next_cursor = encodeCursor(rows[limit - 1]) if len(rows) > limit else None
+    return MockSupabaseResponse(data={'resumes': rows[:limit], 'nextCursor': next_cursor})
 
-        if not resumes_response.data:
-            return MockSupabaseResponse(data=[], error=None) # No resumes at all
-
-        # Aggregate counts in Python
-        category_counts = {}
-        # Keep track of uncategorized resumes
-        uncategorized_count = 0
-        
-        for resume in resumes_response.data:
-            cat_id = resume.get('category_id')
-            if cat_id is not None:
-                category_counts[cat_id] = category_counts.get(cat_id, 0) + 1
-            else:
-                uncategorized_count += 1
-                
-        # Add uncategorized count as a special entry with None as the key (surprisingly this works)
-        if uncategorized_count > 0:
-            category_counts[None] = uncategorized_count
-        
-        # Format the output to be similar to what the direct query might have returned
-        # [{ 'category_id': id, 'count': num }, ...]
-        formatted_counts = []
-        for cat_id, count_val in category_counts.items():
-            formatted_counts.append({'category_id': cat_id, 'count': count_val})
+def countByCategory(resumes):
+    """[{'category_id': id, 'count': n}] for resume rows, with None standing for uncategorized."""
+    # Aggregate counts in Python
+    category_counts = {}
+    # Keep track of uncategorized resumes
+    uncategorized_count = 0
+    
+    for resume in resumes:
+        cat_id = resume.get('category_id')
+        if cat_id is not None:
+            category_counts[cat_id] = category_counts.get(cat_id, 0) + 1
+        else:
+            uncategorized_count += 1
             
-        return MockSupabaseResponse(data=formatted_counts, error=None)
+    # Add uncategorized count as a special entry with None as the key (surprisingly this works)
+    if uncategorized_count > 0:
+        category_counts[None] = uncategorized_count
+    
+    # Format the output to be similar to what the direct query might have returned
+    # [{ 'category_id': id, 'count': num }, ...]
+    formatted_counts = []
+    for cat_id, count_val in category_counts.items():
+        formatted_counts.append({'category_id': cat_id, 'count': count_val})
+    return formatted_counts
+
+def categoriesWithCounts(categories_response, counts_response):
+    """getCategoriesWithCountsAsync's result from the getCategoriesAsync and getResumesCountAsync responses."""
+    if hasattr(categories_response, 'error') and categories_response.error:
+        return MockSupabaseResponse(data=None, error=categories_response.error)
+    if counts_response.error:
+        return MockSupabaseResponse(data=None, error=counts_response.error)
 
+    counts = {item['category_id']: item['count'] for item in counts_response.data}
+    categories = categories_response.data or []
+    for category in categories:
+        category['resumeCount'] = counts.get(category['id'], 0)
+    return MockSupabaseResponse(data={
+        'categories': categories,
+        'uncategorized': counts.get(None, 0),
+        'total': sum(counts.values())
+    }, error=None)
+
+@timed('db')
+def validateCategory(user_id, category_id):
+    """The category id if it exists for this user, otherwise None (uncategorized)."""
+    if not category_id:
+        return None
+    category_response = getSupabase().table('categories') \
+        .select('id') \
+        .eq('clerk_id', user_id) \
+        .eq('id', category_id) \
+        .execute()
+    if category_response.data:
+        return category_response.data[0]['id']
+    return None
+
+@timed('storage')
+def storeResumeFile(bucketName, filename, file, content_hash):
+    """Extract a new PDF's text and upload it under its content hash.
+
+    Returns (link, text_content, page_count).
+    """
+    # Extract text now so job matching never has to download and parse the PDF
+    try:
+        text_content, page_count, truncated = extractPdf(file)
+        if truncated:
+            print(f"Text of {filename} was truncated at the page or time limit", file=sys.stderr)
     except Exception as e:
-        # Catch any other unexpected errors during processing
-        print(f"Error in getResumesCount (Python-side aggregation): {e}", file=sys.stderr)
-        # Ensure the error structure is a dictionary with a 'message' key if creating a new error
-        error_details = {'message': str(e), 'details': 'Python-side aggregation failed'}
-        return MockSupabaseResponse(data=None, error=error_details)
+        print(f"Error extracting text from {filename}: {e}", file=sys.stderr)
+        text_content, page_count = None, None
 
-def uploadFile(user_id, bucketName, filename, file, category_id):
-    # Use the provided category_id directly
-    category_id_to_use = None
-    if category_id:
-        # Validate the category exists for this user
-        category_response = supabase.table('categories') \
-            .select('id') \
-            .eq('clerk_id', user_id) \
-            .eq('id', category_id) \
-            .execute()
-        if category_response.data:
-            category_id_to_use = category_response.data[0]['id']
-        else:
-            category_id_to_use = None
-    # If no valid category_id, leave as None (uncategorized)
+    # Upload file to storage, streamed from the same buffer in chunks.
+    # upsert makes a concurrent upload of the same bytes harmless.
+    storage_name = f"{content_hash}.pdf"
+    file.seek(0)
+    body = file if isinstance(file, BufferedReader) else BufferedReader(file)
+    getSupabase().storage.from_(bucketName).upload(
+        storage_name, body, {'content-type': 'application/pdf', 'upsert': 'true'}
+    )
+    fileLink = getSupabase().storage.from_(bucketName).get_public_url(storage_name)
+    return fileLink, text_content, page_count
+
+def resumeRow(user_id, category_id, filename, stored, byte_size, content_hash):
+    fileLink, text_content, page_count = stored
+
+    # Warm the extracted-text cache so a first analysis doesn't fetch the file back
+    if text_content is not None:
+        textCache.put(content_hash, text_content, aliases=[urlCacheKey(fileLink)])
 
     # Append timestamp to filename to avoid collisions
     name, ext = os.path.splitext(filename)
     timestamp = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
     unique_filename = f"{name}_{timestamp}{ext}"
 
-    # Upload file to storage
-    response = supabase.storage.from_(bucketName).upload(unique_filename, file, {'content-type': 'application/pdf'})
-    fileLink = supabase.storage.from_(bucketName).get_public_url(unique_filename)
-
-    # Insert resume record
-    supabase.table('resumes').insert({
+    return {
         'clerk_id': user_id,
-        'category_id': category_id_to_use,
+        'category_id': category_id,
         'name': unique_filename,
         'link': fileLink,
-        'date': datetime.datetime.now().date().isoformat()
-    }).execute()
+        'date': datetime.datetime.now().date().isoformat(),
+        'text_content': text_content,
+        'page_count': page_count,
+        'byte_size': byte_size,
+        'content_hash': content_hash
+    }
 
-    return response
+# Content hashes an upload in this process is about to add a row for. A release holds the lock from
+# its reference count through the storage remove and leaves these objects alone, so an upload that
+# reused or just stored an object can't have it removed before its row is visible. Other processes
+# aren't covered: a release there can still race an upload here.
+_pending_hashes = Counter()
+_release_lock = threading.Lock()
+
+@contextmanager
+def pendingUploads(hashes):
+    hashes = list(hashes)
+    with _release_lock:
+        _pending_hashes.update(hashes)
+    try:
+        yield
+    finally:
+        with _release_lock:
+            _pending_hashes.subtract(hashes)
+            for content_hash in hashes:
+                if _pending_hashes[content_hash] <= 0:
+                    del _pending_hashes[content_hash]
+
+def openUpload(file, content_hash=None):
+    # Accept raw bytes or a seekable binary stream (see uploads.PdfUploadStream)
+    if isinstance(file, bytes):
+        file = io.BytesIO(file)
+    if not content_hash:
+        content_hash = hashStream(file)
+    byte_size = file.seek(0, io.SEEK_END)
+    file.seek(0)
+    return file, content_hash, byte_size
+
+@timed('db')
+def uploadFile(user_id, bucketName, filename, file, category_id, content_hash=None):
+    category_id_to_use = validateCategory(user_id, category_id)
+    file, content_hash, byte_size = openUpload(file, content_hash)
+
+    with pendingUploads([content_hash]):
+        # Storage is content-addressed: identical bytes share one object, each upload still gets its own row
+        existing = getSupabase().table('resumes') \
+            .select('link, text_content, page_count') \
+            .eq('content_hash', content_hash) \
+            .limit(1) \
+            .execute()
+
+        if existing.data:
+            stored = (existing.data[0]['link'], existing.data[0].get('text_content'), existing.data[0].get('page_count'))
+            reused = True
+        else:
+            stored = storeResumeFile(bucketName, filename, file, content_hash)
+            reused = False
+
+        # Insert resume record
+        try:
+            getSupabase().table('resumes').insert(
+                resumeRow(user_id, category_id_to_use, filename, stored, byte_size, content_hash)
+            ).execute()
+        finally:
+            userCache.invalidate(user_id)
+
+    # False when an existing storage object was reused
+    return not reused
+
+@timed('db')
+def uploadFiles(user_id, bucketName, files, category_id, max_workers=4):
+    """Upload many PDFs as one batch.
+
+    `files` is a list of (filename, file, content_hash) like uploadFile takes. The
+    category is validated once, existing hashes are looked up in one query, new
+    objects are stored with at most `max_workers` uploads in flight, and every row
+    goes in with a single bulk insert. Returns one status dict per file, in order.
+    """
+    category_id_to_use = validateCategory(user_id, category_id)
+    uploads = [(filename,) + openUpload(file, content_hash) for filename, file, content_hash in files]
+
+    hashes = list({content_hash for _, _, content_hash, _ in uploads})
+    with pendingUploads(hashes):
+        stored = {}
+        if hashes:
+            existing = getSupabase().table('resumes') \
+                .select('link, text_content, page_count, content_hash') \
+                .in_('content_hash', hashes) \
+                .execute()
+            for row in existing.data or []:
+                stored.setdefault(row['content_hash'], (row['link'], row.get('text_content'), row.get('page_count')))
+
+        # Each new object is stored once, even if the batch repeats it
+        pending = {}
+        for filename, file, content_hash, _ in uploads:
+            if content_hash not in stored and content_hash not in pending:
+                pending[content_hash] = (filename, file)
+
+        errors = {}
+        if pending:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as pool:
+                futures = {
+                    pool.submit(storeResumeFile, bucketName, filename, file, content_hash): content_hash
+                    for content_hash, (filename, file) in pending.items()
+                }
+                for future in as_completed(futures):
+                    content_hash = futures[future]
+                    try:
+                        stored[content_hash] = future.result()
+                    except Exception as e:
+                        print(f"Error uploading {pending[content_hash][0]}: {e}", file=sys.stderr)
+                        errors[content_hash] = str(e)
+
+        rows = []
+        results = []
+        for filename, file, content_hash, byte_size in uploads:
+            if content_hash in errors:
+                results.append({'filename': filename, 'status': 'failed', 'error': errors[content_hash]})
+                continue
+            rows.append(resumeRow(user_id, category_id_to_use, filename, stored[content_hash], byte_size, content_hash))
+            results.append({'filename': filename, 'status': 'uploaded'})
+
+        if rows:
+            try:
+                getSupabase().table('resumes').insert(rows).execute()
+            finally:
+                userCache.invalidate(user_id)
+    return results
+
+def hashStream(file, chunk_size=64 * 1024):
+    file.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.read(chunk_size), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+def storageObjectName(resume):
+    """Storage key for a resume row: content-addressed rows share <content_hash>.pdf,
+    rows from before migration 005 used the resume name."""
+    if resume.get('content_hash'):
+        return f"{resume['content_hash']}.pdf"
+    return resume['name']
+
+@timed('db')
+def releaseResumeFile(bucket_name, resume):
+    """Remove a deleted resume's storage object unless another row still references it."""
+    with _release_lock:
+        if resume.get('content_hash'):
+            if resume['content_hash'] in _pending_hashes:
+                return None
+            remaining = getSupabase().table('resumes') \
+                .select('id') \
+                .eq('content_hash', resume['content_hash']) \
+                .limit(1) \
+                .execute()
+            if remaining.data:
+                return None
+        return deleteResumeFileFromStorage(bucket_name, storageObjectName(resume))
+
+@timed('db')
+def releaseResumeFiles(bucket_name, resumes):
+    """Bulk releaseResumeFile: one query for hashes still referenced, one storage remove call."""
+    hashes = list({r['content_hash'] for r in resumes if r.get('content_hash')})
+    with _release_lock:
+        referenced = {content_hash for content_hash in hashes if content_hash in _pending_hashes}
+        if hashes:
+            remaining = getSupabase().table('resumes').select('content_hash').in_('content_hash', hashes).execute()
+            referenced.update(r['content_hash'] for r in remaining.data or [])
+
+        names = []
+        for resume in resumes:
+            if resume.get('content_hash') in referenced:
+                continue
+            name = storageObjectName(resume)
+            if name not in names:
+                names.append(name)
+        if not names:
+            return None
+        return deleteResumeFileFromStorage(bucket_name, names)
 
 # New functions to move Supabase operations from app.py
 
+@timed('db')
 def updateUserInDB(user_id, updates):
-    response = supabase.table('users').update(updates).eq('clerk_id', user_id).execute()
+    response = getSupabase().table('users').update(updates).eq('clerk_id', user_id).execute()
     return response
 
+@timed('db')
 def getResumeByIdAndUser(resume_id, user_id):
-    response = supabase.table('resumes').select('*').eq('id', resume_id).eq('clerk_id', user_id).execute()
+    response = getSupabase().table('resumes').select(RESUME_COLUMNS).eq('id', resume_id).eq('clerk_id', user_id).execute()
+    return response
+
+@timed('db')
+def getResumeTextByLink(user_id, link):
+    response = getSupabase().table('resumes').select('id, text_content').eq('clerk_id', user_id).eq('link', link).limit(1).execute()
+    return response
+
+@timed('db')
+def getResumeTextsForUser(user_id):
+    response = getSupabase().table('resumes').select('id, name, link, text_content, content_hash').eq('clerk_id', user_id).execute()
+    return response
+
+@timed('db')
+def getResumesMissingText(after_id=0, limit=50):
+    response = getSupabase().table('resumes').select('id, name, link') \
+        .is_('text_content', 'null') \
+        .gt('id', after_id) \
+        .order('id') \
+        .limit(limit) \
+        .execute()
+    return response
+
+@timed('db')
+def updateResumeText(resume_id, text_content, page_count, byte_size):
+    response = getSupabase().table('resumes').update({
+        'text_content': text_content,
+        'page_count': page_count,
+        'byte_size': byte_size
+    }).eq('id', resume_id).execute()
     return response
 
+@timed('storage')
 def deleteResumeFileFromStorage(bucket_name, file_name):
-    # Note: Supabase storage remove can take a list of files.
-    # Ensure file_name is passed as a list if that's how it's used.
-    response = supabase.storage.from_(bucket_name).remove([file_name])
+    # Supabase storage remove takes a list, so a single name or a list of names both work
+    file_names = file_name if isinstance(file_name, list) else [file_name]
+    response = getSupabase().storage.from_(bucket_name).remove(file_names)
+    for name in file_names:
+        blobMirror.delete(name)
     return response
 
+@timed('db')
+def getResumesByIdsAndUser(resume_ids, user_id):
+    response = getSupabase().table('resumes').select(RESUME_COLUMNS).in_('id', resume_ids).eq('clerk_id', user_id).execute()
+    return response
+
+@timed('db')
+def deleteResumesFromDB(resume_ids, user_id):
+    try:
+        response = getSupabase().table('resumes').delete().in_('id', resume_ids).eq('clerk_id', user_id).execute()
+    finally:
+        userCache.invalidate(user_id)
+    return response
+
+@timed('db')
+def moveResumesToCategoryInDB(resume_ids, user_id, new_category_id):
+    try:
+        response = getSupabase().table('resumes').update({
+            'category_id': new_category_id
+        }).in_('id', resume_ids).eq('clerk_id', user_id).execute()
+    finally:
+        userCache.invalidate(user_id)
+    return response
+
+@timed('db')
 def deleteResumeFromDB(resume_id, user_id):
-    response = supabase.table('resumes').delete().eq('id', resume_id).eq('clerk_id', user_id).execute()
+    try:
+        response = getSupabase().table('resumes').delete().eq('id', resume_id).eq('clerk_id', user_id).execute()
+    finally:
+        userCache.invalidate(user_id)
     return response
 
+@timed('db')
 def getCategoryByIdAndUser(category_id, user_id):
-    response = supabase.table('categories').select('*').eq('id', category_id).eq('clerk_id', user_id).execute()
+    response = getSupabase().table('categories').select('*').eq('id', category_id).eq('clerk_id', user_id).execute()
     return response
 
-def moveResumeToCategoryInDB(resume_id, user_id, new_category_id):
-    response = supabase.table('resumes').update({
-        'category_id': new_category_id
-    }).eq('id', resume_id).eq('clerk_id', user_id).execute()
+# Reads and writes behind the async views in app.py, on getAsyncSupabase()
+
+@timed('db')
+async def getCategoriesAsync(user_id):
+    client = await getAsyncSupabase()
+    return await cachedReadAsync(user_id, 'categories', lambda: client.table('categories').select('*').eq('clerk_id', user_id).execute())
+
+@timed('db')
+async def getResumesCountAsync(user_id):
+    """Count of resumes grouped by category, aggregated Python-side."""
+    try:
+        client = await getAsyncSupabase()
+        resumes_response = await client.table('resumes').select('id, category_id').eq('clerk_id', user_id).execute()
+        if hasattr(resumes_response, 'error') and resumes_response.error:
+            return MockSupabaseResponse(data=None, error=resumes_response.error)
+        return MockSupabaseResponse(data=countByCategory(resumes_response.data or []), error=None)
+    except Exception as e:
+        print(f"Error in getResumesCountAsync (Python-side aggregation): {e}", file=sys.stderr)
+        error_details = {'message': str(e), 'details': 'Python-side aggregation failed'}
+        return MockSupabaseResponse(data=None, error=error_details)
+
+@timed('db')
+async def getCategoriesWithCountsAsync(user_id):
+    """Categories with a resumeCount each plus 'uncategorized' and 'total' counts, in one round trip.
+
+    Uses the get_categories_with_counts function from migration 006, falling back to
+    the two-query Python aggregation if the function isn't there yet.
+    """
+    cached = userCache.get(user_id, 'categoriesWithCounts')
+    if cached is not None:
+        return MockSupabaseResponse(data=cached)
+    generation = userCache.generation(user_id)
+
+    client = await getAsyncSupabase()
+    try:
+        response = await client.rpc('get_categories_with_counts', {'p_clerk_id': user_id}).execute()
+        userCache.put(user_id, 'categoriesWithCounts', response.data, generation)
+        return MockSupabaseResponse(data=response.data, error=None)
+    except Exception as e:
+        print(f"get_categories_with_counts unavailable, aggregating in Python: {e}", file=sys.stderr)
+
+    # The fallback's two queries don't depend on each other, so they go out together
+    categories_response, counts_response = await asyncio.gather(
+        getCategoriesAsync(user_id), getResumesCountAsync(user_id)
+    )
+    return categoriesWithCounts(categories_response, counts_response)
+
+@timed('db')
+async def getResumesPageAsync(user_id, category_id=None, columns=RESUME_COLUMNS, cursor=None, limit=RESUME_PAGE_SIZE):
+    """One page of a user's resumes, newest first, with a cursor for the next page.
+
+    `columns` must include date and id (the keyset). Returns data as
+    {'resumes': [...], 'nextCursor': str or None}; raises ValueError on a bad cursor.
+    """
+    limit, after = pageBounds(cursor, limit)
+    client = await getAsyncSupabase()
+    response = await cachedReadAsync(
+        user_id, resumesPageKey(category_id, columns, cursor, limit),
+        lambda: resumesPageQuery(client, user_id, category_id, columns, after, limit).execute()
+    )
+    return resumesPage(response, limit)
+
+@timed('db')
+async def getResumeByIdAndUserAsync(resume_id, user_id):
+    client = await getAsyncSupabase()
+    return await client.table('resumes').select(RESUME_COLUMNS).eq('id', resume_id).eq('clerk_id', user_id).execute()
+
+@timed('db')
+async def getCategoryByIdAndUserAsync(category_id, user_id):
+    client = await getAsyncSupabase()
+    return await client.table('categories').select('*').eq('id', category_id).eq('clerk_id', user_id).execute()
+
+@timed('db')
+async def moveResumeToCategoryInDBAsync(resume_id, user_id, new_category_id):
+    client = await getAsyncSupabase()
+    try:
+        response = await client.table('resumes').update({
+            'category_id': new_category_id
+        }).eq('id', resume_id).eq('clerk_id', user_id).execute()
+    finally:
+        userCache.invalidate(user_id)
     return response
+
+@timed('db')
+async def getResumeTextByLinkAsync(user_id, link):
+    client = await getAsyncSupabase()
+    return await client.table('resumes').select('id, text_content').eq('clerk_id', user_id).eq('link', link).limit(1).execute()
+
+@timed('db')
+async def getResumeTextsForUserAsync(user_id):
+    client = await getAsyncSupabase()
+    return await client.table('resumes').select('id, name, link, text_content, content_hash').eq('clerk_id', user_id).execute()
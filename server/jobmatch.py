@@ -1,56 +1,395 @@
-# from openai import OpenAI
 import os
-from dotenv import load_dotenv
-from openai import OpenAI
+from llmclient import getLLMClient, loadAsyncLLMClient, CircuitOpenError
 
-import requests
-import io
-from pypdf import PdfReader
+import asyncio
+import hashlib
+import re
+import time
+import threading
+from collections import Counter, OrderedDict
+import numpy as np
 
-load_dotenv()
-key: str = os.environ.get("GEMINI_API_KEY")
-proj: str = os.environ.get("OPENAI_PROJECT")
-org: str = os.environ.get("OPENAI_ORG")
+from textcache import TextCache
+from blobmirror import BlobMirror
+from resultcache import ResultCache
+from metrics import timed
+from pdfextract import getPdfExtractor
 
+# Extracted text, keyed by the SHA-256 of the PDF bytes with the resume URL as an alias
+textCache = TextCache(
+    directory=os.environ.get("TEXT_CACHE_DIR") or "/tmp/resumevc/text",
+    max_memory_bytes=int(os.environ.get("TEXT_CACHE_MEMORY_BYTES") or 32 * 1024 * 1024),
+    max_disk_bytes=int(os.environ.get("TEXT_CACHE_DISK_BYTES") or 256 * 1024 * 1024)
+)
+
+# Resume PDFs as last downloaded, revalidated against storage by ETag
+blobMirror = BlobMirror(
+    directory=os.environ.get("BLOB_MIRROR_DIR") or "/tmp/resumevc/blobs",
+    max_bytes=int(os.environ.get("BLOB_MIRROR_BYTES") or 512 * 1024 * 1024),
+    pool_size=int(os.environ.get("BLOB_POOL_SIZE") or 10)
+)
+
+MODEL = "gemini-2.0-flash"
+SYSTEM_PROMPT = "You are a human who sees if resumes and job descriptions match. Do not use any markdown and just use text. Return a percentage for the match along with feedback. Use specific keywords highlighted in both."
+# Bump whenever the prompt changes so cached results from the old prompt aren't reused
+PROMPT_VERSION = "1"
+
+# LLM replies, keyed on the normalized job description, the resume text and the model/prompt version
+matchCache = ResultCache(
+    ttl=int(os.environ.get("MATCH_CACHE_TTL") or 24 * 3600),
+    max_entries=int(os.environ.get("MATCH_CACHE_SIZE") or 1024),
+    sqlite_path=os.environ.get("MATCH_CACHE_DB") or None
+)
+
+def matchCacheKey(jobDesc, resume):
+    normalized = " ".join((jobDesc or "").split())
+    digest = hashlib.sha256()
+    for part in (MODEL, PROMPT_VERSION, normalized, resume or ""):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def buildMessages(jobDesc, resume):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": f"Here is the job description: {jobDesc}\n Here is the resume in text form: {resume}"
+        }
+    ]
+
+@timed('llm')
 def compareResumeJobDesc(jobDesc, resume):
+    cache_key = matchCacheKey(jobDesc, resume)
+    cached = matchCache.get(cache_key)
+    if cached is not None:
+        return {'response': cached}, 200
+
     try:
-        client = OpenAI(
-            api_key=key,
-            base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
+        started = time.perf_counter()
+        # Shared pooled client with timeouts, retries and a circuit breaker, see llmclient.py
+        response = getLLMClient().chat(
+            model=MODEL,
+            messages=buildMessages(jobDesc, resume)
         )
+        reply = response.choices[0].message.content
+        # print(f"[OPENAI] response - {reply}")
+        if reply:
+            matchCache.put(cache_key, reply, latency=time.perf_counter() - started)
+        return {'response': reply}, 200
+    except Exception as e:
+        return matchError(e)
 
-        response = client.chat.completions.create(
-            model="gemini-2.0-flash",
-            messages=[
-                {"role": "system", "content": "You are a human who sees if resumes and job descriptions match. Do not use any markdown and just use text. Return a percentage for the match along with feedback. Use specific keywords highlighted in both."},
-                {
-                    "role": "user",
-                    "content": f"Here is the job description: {jobDesc}\n Here is the resume in text form: {resume}"
-                }
-            ]
+@timed('llm')
+async def compareResumeJobDescAsync(jobDesc, resume):
+    """compareResumeJobDesc on the async LLM client, for the async views.
+
+    The match cache may go to SQLite, so it is read and written on worker threads.
+    """
+    cache_key = matchCacheKey(jobDesc, resume)
+    cached = await asyncio.to_thread(matchCache.get, cache_key)
+    if cached is not None:
+        return {'response': cached}, 200
+
+    try:
+        started = time.perf_counter()
+        client = await loadAsyncLLMClient()
+        response = await client.chat(
+            model=MODEL,
+            messages=buildMessages(jobDesc, resume)
         )
         reply = response.choices[0].message.content
-        # print(f"[OPENAI] response - {reply}")
+        if reply:
+            await asyncio.to_thread(matchCache.put, cache_key, reply, latency=time.perf_counter() - started)
         return {'response': reply}, 200
     except Exception as e:
-        print(f"[OpenAI Error] {e}")
-        return {'error': 'Failed to contact OpenAI'}, 500
+        return matchError(e)
+
+def matchError(e):
+    print(f"[OpenAI Error] {e}")
+    if isinstance(e, CircuitOpenError):
+        return {'error': 'Job analysis is temporarily unavailable, please try again shortly'}, 503
+    return {'error': 'Failed to contact OpenAI'}, 500
+
+def streamResumeJobDesc(jobDesc, resume):
+    """Generator version of compareResumeJobDesc that yields the reply as it is generated.
+
+    Errors are raised to the caller (CircuitOpenError included); the full reply is
+    cached once the stream completes, and a cached reply is yielded in one piece.
+    """
+    cache_key = matchCacheKey(jobDesc, resume)
+    cached = matchCache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    started = time.perf_counter()
+    parts = []
+    for delta in getLLMClient().chatStream(model=MODEL, messages=buildMessages(jobDesc, resume)):
+        parts.append(delta)
+        yield delta
+
+    reply = "".join(parts)
+    if reply:
+        matchCache.put(cache_key, reply, latency=time.perf_counter() - started)
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or our that the their this to was we
+were will with you your they them he she his her i me my not but if so than then there these those
+""".split())
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+def tokenize(text):
+    """Lowercase keyword tokens, keeping things like c++, c# and node.js intact."""
+    if not text:
+        return []
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS and len(token) > 1]
+
+class KeywordIndex:
+    """BM25 term index over a set of resumes, scored with NumPy.
+
+    Postings are stored column-wise (term -> docs, term frequencies) in flat
+    arrays, so scoring a job description only touches the postings of its own
+    terms and the per-document sum is a single bincount.
+    """
+
+    def __init__(self, docs, k1=1.5, b=0.75):
+        # docs: list of (doc_id, text)
+        self.k1 = k1
+        self.b = b
+        self.doc_ids = [doc_id for doc_id, _ in docs]
+
+        postings = {}
+        lengths = np.zeros(len(docs), dtype=np.float32)
+        for doc, (_, text) in enumerate(docs):
+            counts = Counter(tokenize(text))
+            lengths[doc] = sum(counts.values())
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc, tf))
+
+        self.terms = {term: i for i, term in enumerate(postings)}
+        self.vocab = list(postings)
+        sizes = np.fromiter((len(p) for p in postings.values()), dtype=np.int64, count=len(postings))
+        self.term_ptr = np.zeros(len(postings) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self.term_ptr[1:])
+        flat = [entry for p in postings.values() for entry in p]
+        self.post_docs = np.fromiter((d for d, _ in flat), dtype=np.int32, count=len(flat))
+        self.post_tfs = np.fromiter((tf for _, tf in flat), dtype=np.float32, count=len(flat))
+
+        n = len(docs)
+        self.doc_lengths = lengths
+        avgdl = float(lengths.mean()) if n and lengths.sum() else 1.0
+        self.norm = self.k1 * (1 - self.b + self.b * lengths / avgdl)
+        self.idf = np.log1p((n - sizes + 0.5) / (sizes + 0.5)).astype(np.float32)
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def score(self, query):
+        """BM25 score of every document against `query`, plus the query term ids that hit."""
+        term_ids = sorted({self.terms[t] for t in tokenize(query) if t in self.terms})
+        scores = np.zeros(len(self.doc_ids), dtype=np.float32)
+        if not term_ids:
+            return scores, term_ids
+        slices = [np.arange(self.term_ptr[t], self.term_ptr[t + 1]) for t in term_ids]
+        idx = np.concatenate(slices)
+        docs = self.post_docs[idx]
+        tfs = self.post_tfs[idx]
+        idf = np.repeat(self.idf[term_ids], [len(sl) for sl in slices])
+        weights = idf * tfs * (self.k1 + 1) / (tfs + self.norm[docs])
+        scores += np.bincount(docs, weights=weights, minlength=len(self.doc_ids)).astype(np.float32)
+        return scores, term_ids
+
+    def rank(self, query, top_k=None):
+        """[(doc_id, score, matched_keywords)] best first, skipping documents with no overlap."""
+        scores, term_ids = self.score(query)
+        hits = np.flatnonzero(scores > 0)
+        order = hits[np.argsort(-scores[hits], kind='stable')]
+        if top_k is not None:
+            order = order[:top_k]
+
+        # Postings are sorted by doc, so membership of the ranked docs is a binary search per term
+        hits_by_term = []
+        for t in term_ids:
+            docs = self.post_docs[self.term_ptr[t]:self.term_ptr[t + 1]]
+            pos = np.minimum(np.searchsorted(docs, order), len(docs) - 1)
+            hits_by_term.append((self.vocab[t], docs[pos] == order))
+        return [
+            (self.doc_ids[doc], float(scores[doc]), [term for term, hit in hits_by_term if hit[i]])
+            for i, doc in enumerate(order.tolist())
+        ]
+
+_keywordIndexes = OrderedDict()  # user_id -> (signature, KeywordIndex)
+_keywordIndexLock = threading.Lock()
+MAX_KEYWORD_INDEXES = 256
+
+def getKeywordIndex(user_id, resumes):
+    """Per-user KeywordIndex, rebuilt only when that user's set of resumes changes."""
+    signature = tuple((r.get('id'), r.get('content_hash') or len(r.get('text_content') or '')) for r in resumes)
+    with _keywordIndexLock:
+        cached = _keywordIndexes.get(user_id)
+        if cached and cached[0] == signature:
+            _keywordIndexes.move_to_end(user_id)
+            return cached[1]
+
+    index = KeywordIndex([(r.get('id'), r.get('text_content') or '') for r in resumes])
+    with _keywordIndexLock:
+        _keywordIndexes[user_id] = (signature, index)
+        _keywordIndexes.move_to_end(user_id)
+        while len(_keywordIndexes) > MAX_KEYWORD_INDEXES:
+            _keywordIndexes.popitem(last=False)
+    return index
+
+def keywordRank(jobDesc, resumes, user_id=None):
+    """Offline BM25 ranking of resumes (rows with `id` and `text_content`) against a job description.
+
+    Every resume is returned with `keywordScore` and `matchedKeywords`, best first.
+    """
+    index = getKeywordIndex(user_id, resumes) if user_id else KeywordIndex(
+        [(r.get('id'), r.get('text_content') or '') for r in resumes]
+    )
+    results = {doc_id: (score, keywords) for doc_id, score, keywords in index.rank(jobDesc)}
+    ranked = []
+    for r in resumes:
+        score, keywords = results.get(r.get('id'), (0.0, []))
+        ranked.append({
+            'id': r.get('id'),
+            'name': r.get('name'),
+            'link': r.get('link'),
+            'keywordScore': round(score, 4),
+            'matchedKeywords': keywords
+        })
+    ranked.sort(key=lambda r: -r['keywordScore'])
+    return ranked
+
+def parseMatchScore(reply):
+    """Pull the match percentage out of a compareResumeJobDesc reply, or None if there isn't one."""
+    if not reply:
+        return None
+    match = re.search(r'(\d{1,3}(?:\.\d+)?)\s*%', reply)
+    if not match:
+        return None
+    return min(float(match.group(1)), 100.0)
+
+@timed('llm')
+@timed('llm')
+async def rankResumesAsync(jobDesc, resumes, max_concurrency=8, shortlist=None, user_id=None):
+    """Score every resume against one job description concurrently.
+
+    `resumes` are rows with at least `link` and optionally `text_content`. The
+    LLM calls are awaited together on the event loop, at most `max_concurrency`
+    at once, so the wall-clock time tracks the slowest call rather than the sum
+    of all of them; keyword ranking and PDFs without stored text run on worker
+    threads. With `shortlist`, only the best keyword (BM25) matches go to the LLM.
+    Returns the rows with `score` and `analysis` added, best match first.
+    """
+    if not resumes:
+        return []
+
+    # Keyword ranking is CPU work, kept off the event loop the other requests share
+    keyword_results, candidates = await asyncio.to_thread(shortlistResumes, jobDesc, resumes, shortlist, user_id)
+    limit = asyncio.Semaphore(max_concurrency)
+
+    async def scoreOne(resume):
+        async with limit:
+            text = resume.get('text_content')
+            if text is None:
+                text = await asyncio.to_thread(readPdf, resume.get('link'))
+            result, status = await compareResumeJobDescAsync(jobDesc, text)
+        return scoredRow(resume, result)
+
+    ranked = await asyncio.gather(*(scoreOne(r) for r in candidates))
+    return finishRanking(list(ranked), resumes, keyword_results)
+
+def shortlistResumes(jobDesc, resumes, shortlist, user_id):
+    """Keyword results by resume id, and the resumes worth an LLM call."""
+    keyword_results = {r['id']: r for r in keywordRank(jobDesc, resumes, user_id)}
+    candidates = resumes
+    if shortlist and len(resumes) > shortlist:
+        # Resumes without stored text can't be pre-ranked offline. They take shortlist slots after
+        # any keyword match and before text that matched nothing; the rest come back unscored
+        textless = {r.get('id') for r in resumes if r.get('text_content') is None}
+
+        def tier(r):
+            if r['id'] in textless:
+                return 1
+            return 0 if r['keywordScore'] > 0 else 2
+        keep = {r['id'] for r in sorted(keyword_results.values(), key=tier)[:shortlist]}
+        candidates = [r for r in resumes if r.get('id') in keep]
+    return keyword_results, candidates
+
+def scoredRow(resume, result):
+    reply = result.get('response')
+    return {
+        'id': resume.get('id'),
+        'name': resume.get('name'),
+        'link': resume.get('link'),
+        'score': parseMatchScore(reply),
+        'analysis': reply,
+        'error': result.get('error')
+    }
+
+def finishRanking(ranked, resumes, keyword_results):
+    scored = {r['id'] for r in ranked}
+    for r in resumes:
+        if r.get('id') not in scored:
+            ranked.append({'id': r.get('id'), 'name': r.get('name'), 'link': r.get('link'),
+                           'score': None, 'analysis': None, 'error': None})
+    for r in ranked:
+        keyword = keyword_results.get(r['id'], {})
+        r['keywordScore'] = keyword.get('keywordScore', 0.0)
+        r['matchedKeywords'] = keyword.get('matchedKeywords', [])
+
+    # Highest score first, unscored resumes last (in keyword order)
+    ranked.sort(key=lambda r: (r['score'] is None, -(r['score'] or 0), -r['keywordScore']))
+    return ranked
+
+def urlCacheKey(pdf_url: str) -> str:
+    # Resume links point at uniquely named storage objects, so the URL identifies the bytes
+    return "url-" + hashlib.sha256(pdf_url.encode("utf-8")).hexdigest()
+
+@timed('pdf_parse')
+def extractPdf(data):
+    """Return PdfText(text, page_count, truncated) for PDF bytes, a file path or a seekable binary stream.
+
+    truncated is set when the page or time limit cut extraction short; text then
+    holds the pages that were read. Raises PdfTooLargeError over PDF_MAX_BYTES.
+    """
+    if not isinstance(data, (bytes, str)):
+        data.seek(0)
+        data = data.read()
+    return getPdfExtractor().extract(data)
+
+def extractText(data) -> str:
+    return extractPdf(data).text
+
+@timed('pdf_download')
+def fetchPdf(pdf_url: str) -> bytes:
+    response = blobMirror.session.get(pdf_url, timeout=blobMirror.timeout)
+    response.raise_for_status()  # Handle bad URLs or network issues
+    return response.content
+
+@timed('pdf_download')
+def mirrorPdf(pdf_url: str):
+    return blobMirror.fetch(pdf_url)
 
 def readPdf(pdf_url: str) -> str:
     try:
-        response = requests.get(pdf_url)
-        response.raise_for_status()  # Handle bad URLs or network issues
+        url_key = urlCacheKey(pdf_url)
+        cached = textCache.get(url_key)
+        if cached is not None:
+            return cached
 
-        pdf_file = io.BytesIO(response.content)
-        reader = PdfReader(pdf_file)
+        blob = mirrorPdf(pdf_url)
 
-        all_text = ""
-        for page in reader.pages:
-            text = page.extract_text()
-            if text:
-                all_text += text + "\n"
+        # Same bytes under another URL still skip the parse
+        content_key = blob.sha256
+        all_text = textCache.get(content_key)
+        if all_text is None:
+            all_text = extractText(blob.path)
+        textCache.put(content_key, all_text, aliases=[url_key])
 
-        return all_text.strip()
+        return all_text
 
     except Exception as e:
         print(f"[PDF Error] {e}")
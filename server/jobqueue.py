@@ -0,0 +1,132 @@
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+class QueueFullError(Exception):
+    """Raised by JobQueue.submit when the pending queue is at capacity."""
+
+class JobStore:
+    """Job state in a small SQLite file, so any worker process can answer a poll."""
+
+    def __init__(self, sqlite_path, retention=24 * 3600):
+        self.retention = retention
+        directory = os.path.dirname(sqlite_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            'id TEXT PRIMARY KEY, user_id TEXT NOT NULL, status TEXT NOT NULL, '
+            'result TEXT NULL, error TEXT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL)'
+        )
+        self._db.commit()
+
+    def create(self, job_id, user_id):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO jobs (id, user_id, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)',
+                (job_id, user_id, 'queued', now, now)
+            )
+            # Old jobs are dropped as new ones come in
+            self._db.execute('DELETE FROM jobs WHERE updated_at < ?', (now - self.retention,))
+            self._db.commit()
+
+    def update(self, job_id, status, result=None, error=None):
+        with self._lock:
+            self._db.execute(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?',
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id)
+            )
+            self._db.commit()
+
+    def delete(self, job_id):
+        with self._lock:
+            self._db.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+            self._db.commit()
+
+    def get(self, job_id, user_id):
+        with self._lock:
+            row = self._db.execute(
+                'SELECT id, status, result, error, created_at, updated_at FROM jobs WHERE id = ? AND user_id = ?',
+                (job_id, user_id)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'jobId': row[0],
+            'status': row[1],
+            'result': json.loads(row[2]) if row[2] else None,
+            'error': row[3],
+            'createdAt': row[4],
+            'updatedAt': row[5]
+        }
+
+class JobQueue:
+    """Bounded in-process queue drained by a fixed pool of worker threads.
+
+    Request threads only enqueue and return, so slow analyses never hold a
+    Flask worker. When `max_pending` jobs are already waiting, submit raises
+    QueueFullError so the caller can shed load instead of queueing forever.
+    """
+
+    def __init__(self, store, workers=4, max_pending=32):
+        self.store = store
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self.stats = {'submitted': 0, 'rejected': 0, 'completed': 0, 'failed': 0}
+
+    def _ensureWorkers(self):
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"analysis-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, user_id, fn, *args):
+        self._ensureWorkers()
+        # Cheap check first so an overloaded queue sheds load without touching SQLite
+        if self._queue.full():
+            self.stats['rejected'] += 1
+            raise QueueFullError("Analysis queue is full")
+        job_id = uuid.uuid4().hex
+        self.store.create(job_id, user_id)
+        try:
+            self._queue.put_nowait((job_id, fn, args))
+        except queue.Full:
+            self.store.delete(job_id)
+            self.stats['rejected'] += 1
+            raise QueueFullError("Analysis queue is full")
+        self.stats['submitted'] += 1
+        return job_id
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _work(self):
+        while True:
+            job_id, fn, args = self._queue.get()
+            try:
+                self.store.update(job_id, 'running')
+                result = fn(*args)
+                self.store.update(job_id, 'done', result=result)
+                self.stats['completed'] += 1
+            except Exception as e:
+                print(f"Analysis job {job_id} failed: {e}", file=sys.stderr)
+                self.store.update(job_id, 'failed', error=str(e))
+                self.stats['failed'] += 1
+            finally:
+                self._queue.task_done()
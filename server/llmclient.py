@@ -0,0 +1,271 @@
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the LLM while the upstream is considered degraded."""
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failed calls and fails fast for
+    `reset_timeout` seconds, then lets a single trial call through (half-open)."""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half-open'
+            return 'open'
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def recordSuccess(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def recordInconclusive(self):
+        """A call ended in a way that says nothing about upstream health (a bad request, say):
+        leave the state alone, but let another call be the half-open trial."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def recordFailure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+def isRetryable(error):
+    import openai  # Already loaded by the LLMClient that raised the error
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+def retryAfter(error):
+    """Seconds from a Retry-After header on the error response, if the upstream sent one."""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+class RetryingClient:
+    """Retry, backoff and circuit breaker bookkeeping shared by LLMClient and AsyncLLMClient.
+
+    Subclasses open their connections in _connect() and wrap every call in
+    _admit() and _retryDelay().
+    """
+
+    def __init__(self, api_key, base_url=GEMINI_BASE_URL, connect_timeout=5.0, read_timeout=60.0,
+                 max_retries=3, backoff_base=0.5, backoff_cap=8.0, pool_size=20, breaker=None):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = {'calls': 0, 'retries': 0, 'failures': 0, 'short_circuited': 0}
+
+        self._connect(api_key, base_url, connect_timeout, read_timeout, pool_size)
+
+    def _connect(self, api_key, base_url, connect_timeout, read_timeout, pool_size):
+        raise NotImplementedError
+
+    def backoff(self, attempt, error=None):
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        hinted = retryAfter(error) if error is not None else None
+        if hinted is not None:
+            delay = max(delay, min(hinted, self.backoff_cap))
+        return delay
+
+    def _admit(self):
+        if not self.breaker.allow():
+            self.stats['short_circuited'] += 1
+            raise CircuitOpenError("LLM upstream is degraded, failing fast")
+        self.stats['calls'] += 1
+
+    def _retryDelay(self, error, attempt):
+        """Seconds to wait before retrying after `error`, or None if the caller should re-raise it."""
+        if not isRetryable(error):
+            # Bad requests etc. say nothing about upstream health
+            self.breaker.recordInconclusive()
+            return None
+        if attempt == self.max_retries:
+            self.stats['failures'] += 1
+            self.breaker.recordFailure()
+            return None
+        self.stats['retries'] += 1
+        delay = self.backoff(attempt, error)
+        print(f"[LLM] {type(error).__name__}, retrying in {delay:.2f}s", file=sys.stderr)
+        return delay
+
+class LLMClient(RetryingClient):
+    """One pooled OpenAI-compatible client shared by every request.
+
+    Connections are reused across calls, every call has connect/read timeouts,
+    429/5xx/timeouts are retried with full-jitter exponential backoff, and a
+    circuit breaker fails fast while the upstream keeps failing.
+    """
+
+    def _connect(self, api_key, base_url, connect_timeout, read_timeout, pool_size):
+        # The SDK is slow to import, so it's loaded with the first client instead of at startup
+        import httpx
+        from openai import OpenAI
+
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+        )
+        # Retries are ours, so the SDK's own retry loop is turned off
+        self.client = OpenAI(api_key=api_key, base_url=base_url, http_client=self.http_client, max_retries=0)
+
+    def _call(self, fn):
+        self._admit()
+        for attempt in range(self.max_retries + 1):
+            try:
+                result = fn()
+                self.breaker.recordSuccess()
+                return result
+            except Exception as e:
+                delay = self._retryDelay(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    def chat(self, model, messages, **kwargs):
+        return self._call(lambda: self.client.chat.completions.create(model=model, messages=messages, **kwargs))
+
+    def chatStream(self, model, messages, **kwargs):
+        """Yield content deltas as they arrive. Only opening the stream is retried;
+        once tokens have been sent on, a failure is final."""
+        stream = self._call(
+            lambda: self.client.chat.completions.create(model=model, messages=messages, stream=True, **kwargs)
+        )
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception:
+            self.stats['failures'] += 1
+            self.breaker.recordFailure()
+            raise
+        finally:
+            stream.close()
+
+class AsyncLLMClient(RetryingClient):
+    """LLMClient for coroutines: the same retries and breaker on AsyncOpenAI.
+    There is no chatStream; streaming goes through the sync LLMClient.
+
+    The pool is split into shards of `shard_size` connections, each its own
+    httpx.AsyncClient. httpx's async pool checks every connection it holds
+    whenever one changes state, at a cost that grows with the pool, so many
+    small pools are much cheaper per call than one large one. A call waits
+    here for a free connection slot rather than queueing inside httpx.
+    The pools belong to the event loop they are first used on, which is the
+    shared loop in aio.py.
+    """
+
+    shard_size = 4
+
+    def _connect(self, api_key, base_url, connect_timeout, read_timeout, pool_size):
+        import httpx
+        from openai import AsyncOpenAI
+
+        self.clients = []
+        self._slots = asyncio.Queue()
+        for start in range(0, max(pool_size, 1), self.shard_size):
+            size = min(self.shard_size, pool_size - start) or 1
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=size, max_keepalive_connections=size),
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+            )
+            client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0)
+            self.clients.append(client)
+            for _ in range(size):
+                self._slots.put_nowait(client)
+
+    async def _call(self, fn):
+        self._admit()
+        for attempt in range(self.max_retries + 1):
+            try:
+                client = await self._slots.get()
+                try:
+                    result = await fn(client)
+                finally:
+                    self._slots.put_nowait(client)
+                self.breaker.recordSuccess()
+                return result
+            except Exception as e:
+                delay = self._retryDelay(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+    async def chat(self, model, messages, **kwargs):
+        return await self._call(lambda client: client.chat.completions.create(model=model, messages=messages, **kwargs))
+
+def clientSettings():
+    return dict(
+        api_key=os.environ.get("GEMINI_API_KEY"),
+        base_url=os.environ.get("LLM_BASE_URL") or GEMINI_BASE_URL,
+        connect_timeout=float(os.environ.get("LLM_CONNECT_TIMEOUT") or 5),
+        read_timeout=float(os.environ.get("LLM_READ_TIMEOUT") or 60),
+        max_retries=int(os.environ.get("LLM_MAX_RETRIES") or 3),
+        pool_size=int(os.environ.get("LLM_POOL_SIZE") or 20)
+    )
+
+_client = None
+_client_lock = threading.Lock()
+
+def getLLMClient():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient(**clientSettings())
+    return _client
+
+_async_client = None
+_async_client_lock = threading.Lock()
+
+def getAsyncLLMClient():
+    """The async client, sharing its circuit breaker with getLLMClient() since both call the same upstream."""
+    global _async_client
+    if _async_client is None:
+        with _async_client_lock:
+            if _async_client is None:
+                _async_client = AsyncLLMClient(breaker=getLLMClient().breaker, **clientSettings())
+    return _async_client
+
+async def loadAsyncLLMClient():
+    """getAsyncLLMClient() for coroutines. Building the client imports the OpenAI SDK,
+    so the first call does that on a worker thread rather than on the event loop."""
+    if _async_client is None:
+        return await asyncio.to_thread(getAsyncLLMClient)
+    return _async_client
@@ -0,0 +1,385 @@
+import asyncio
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+
+# migrations/001-007 translated to SQLite
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    clerk_id VARCHAR(255) PRIMARY KEY,
+    email VARCHAR(100) NOT NULL UNIQUE,
+    name VARCHAR(50) NOT NULL UNIQUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    clerk_id VARCHAR(255) NOT NULL,
+    name VARCHAR(50) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (clerk_id) REFERENCES users (clerk_id) ON DELETE CASCADE,
+    UNIQUE (clerk_id, name)
+);
+CREATE TABLE IF NOT EXISTS resumes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    clerk_id VARCHAR(255) NOT NULL,
+    category_id INT NULL,
+    name VARCHAR(100) NOT NULL,
+    link TEXT NOT NULL,
+    date DATE NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    text_content TEXT NULL,
+    page_count INT NULL,
+    byte_size INT NULL,
+    content_hash CHAR(64) NULL,
+    FOREIGN KEY (clerk_id) REFERENCES users (clerk_id) ON DELETE CASCADE,
+    FOREIGN KEY (category_id) REFERENCES categories (id) ON DELETE SET NULL
+);
+CREATE INDEX IF NOT EXISTS resumes_content_hash_idx ON resumes (content_hash);
+CREATE INDEX IF NOT EXISTS resumes_clerk_category_date_idx ON resumes (clerk_id, category_id, date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS resumes_clerk_date_idx ON resumes (clerk_id, date DESC, id DESC);
+"""
+
+OPERATORS = {'eq': '=', 'neq': '!=', 'lt': '<', 'lte': '<=', 'gt': '>', 'gte': '>='}
+
+class LocalResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+def splitFilters(text):
+    """Split a PostgREST logic filter on top-level commas: 'a.eq.1,and(b.eq.2,c.eq.3)'."""
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(text):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+class LocalQuery:
+    """Builder for one statement, mirroring the postgrest-py calls database.py makes."""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.columns = client.columns(table)
+        self.action = 'select'
+        self.selected = '*'
+        self.payload = None
+        self.where = []
+        self.params = []
+        self.ordering = []
+        self.row_limit = None
+
+    def _column(self, name):
+        if name not in self.columns:
+            raise ValueError(f"Unknown column {self.table}.{name}")
+        return name
+
+    def _condition(self, column, op, value):
+        column = self._column(column)
+        if op == 'is':
+            if str(value).lower() != 'null':
+                raise ValueError(f"Unsupported is filter: {value}")
+            return f"{column} IS NULL", []
+        if op not in OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        return f"{column} {OPERATORS[op]} ?", [value]
+
+    def _logic(self, text, joiner):
+        clauses, params = [], []
+        for part in splitFilters(text):
+            match = re.match(r'^(and|or)\((.*)\)$', part)
+            if match:
+                clause, values = self._logic(match.group(2), match.group(1).upper())
+            else:
+                column, op, value = part.split('.', 2)
+                clause, values = self._condition(column, op, value)
+            clauses.append(clause)
+            params.extend(values)
+        return '(' + f' {joiner} '.join(clauses) + ')', params
+
+    def _filter(self, clause, params=()):
+        self.where.append(clause)
+        self.params.extend(params)
+        return self
+
+    def select(self, columns='*', count=None):
+        self.selected = columns
+        return self
+
+    def insert(self, rows):
+        self.action = 'insert'
+        self.payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def update(self, values):
+        self.action = 'update'
+        self.payload = values
+        return self
+
+    def delete(self):
+        self.action = 'delete'
+        return self
+
+    def eq(self, column, value):
+        return self._filter(*self._condition(column, 'eq', value))
+
+    def neq(self, column, value):
+        return self._filter(*self._condition(column, 'neq', value))
+
+    def lt(self, column, value):
+        return self._filter(*self._condition(column, 'lt', value))
+
+    def lte(self, column, value):
+        return self._filter(*self._condition(column, 'lte', value))
+
+    def gt(self, column, value):
+        return self._filter(*self._condition(column, 'gt', value))
+
+    def gte(self, column, value):
+        return self._filter(*self._condition(column, 'gte', value))
+
+    def is_(self, column, value):
+        return self._filter(*self._condition(column, 'is', value))
+
+    def in_(self, column, values):
+        values = list(values)
+        if not values:
+            return self._filter('0')
+        return self._filter(f"{self._column(column)} IN ({', '.join('?' * len(values))})", values)
+
+    def or_(self, filters):
+        return self._filter(*self._logic(filters, 'OR'))
+
+    def order(self, column, desc=False):
+        self.ordering.append(f"{self._column(column)} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, size):
+        self.row_limit = int(size)
+        return self
+
+    def _projection(self):
+        if self.selected.strip() == '*':
+            return '*'
+        return ', '.join(self._column(c.strip()) for c in self.selected.split(','))
+
+    def _where(self):
+        return f" WHERE {' AND '.join(self.where)}" if self.where else ''
+
+    def execute(self):
+        if self.action == 'select':
+            sql = f"SELECT {self._projection()} FROM {self.table}{self._where()}"
+            if self.ordering:
+                sql += f" ORDER BY {', '.join(self.ordering)}"
+            if self.row_limit is not None:
+                sql += f" LIMIT {self.row_limit}"
+            return LocalResponse(self.client.query(sql, self.params))
+
+        if self.action == 'insert':
+            rows = []
+            for row in self.payload:
+                columns = [self._column(c) for c in row]
+                sql = (f"INSERT INTO {self.table} ({', '.join(columns)}) "
+                       f"VALUES ({', '.join('?' * len(columns))}) RETURNING *")
+                rows.extend(self.client.query(sql, list(row.values()), write=True))
+            return LocalResponse(rows)
+
+        if self.action == 'update':
+            assignments = ', '.join(f"{self._column(c)} = ?" for c in self.payload)
+            sql = f"UPDATE {self.table} SET {assignments}{self._where()} RETURNING *"
+            return LocalResponse(self.client.query(sql, list(self.payload.values()) + self.params, write=True))
+
+        sql = f"DELETE FROM {self.table}{self._where()} RETURNING *"
+        return LocalResponse(self.client.query(sql, self.params, write=True))
+
+class LocalRpc:
+    def __init__(self, client, name, params):
+        self.client = client
+        self.name = name
+        self.params = params or {}
+
+    def execute(self):
+        if self.name != 'get_categories_with_counts':
+            raise ValueError(f"Unknown function {self.name}")
+        # Same result as migrations/006_create_category_counts_function.sql
+        user_id = self.params['p_clerk_id']
+        categories = self.client.query(
+            'SELECT categories.*, COUNT(resumes.id) AS resumeCount FROM categories '
+            'LEFT JOIN resumes ON resumes.category_id = categories.id AND resumes.clerk_id = ? '
+            'WHERE categories.clerk_id = ? GROUP BY categories.id ORDER BY categories.id',
+            [user_id, user_id]
+        )
+        totals = self.client.query(
+            'SELECT COUNT(*) AS total, COALESCE(SUM(category_id IS NULL), 0) AS uncategorized '
+            'FROM resumes WHERE clerk_id = ?',
+            [user_id]
+        )[0]
+        return LocalResponse({
+            'categories': categories,
+            'uncategorized': totals['uncategorized'],
+            'total': totals['total']
+        })
+
+class LocalBucket:
+    """A storage bucket as a directory; object names map to files under it."""
+
+    def __init__(self, storage, name):
+        self.storage = storage
+        self.name = name
+        self.directory = os.path.join(storage.directory, name)
+
+    def _path(self, path):
+        path = path.lstrip('/')
+        full = os.path.normpath(os.path.join(self.directory, path))
+        if not full.startswith(os.path.normpath(self.directory) + os.sep):
+            raise ValueError(f"Invalid object name: {path}")
+        return full
+
+    def upload(self, path, file, file_options=None):
+        target = self._path(path)
+        upsert = str((file_options or {}).get('upsert', 'false')).lower() == 'true'
+        if os.path.exists(target) and not upsert:
+            raise FileExistsError(f"The resource already exists: {path}")
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+
+        # Write beside the target and rename, so readers never see half a file
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target))
+        with os.fdopen(fd, 'wb') as out:
+            if isinstance(file, (bytes, bytearray)):
+                out.write(file)
+            elif isinstance(file, str):
+                with open(file, 'rb') as source:
+                    shutil.copyfileobj(source, out)
+            else:
+                shutil.copyfileobj(file, out)
+        os.replace(temp_path, target)
+        return {'Key': f"{self.name}/{path}"}
+
+    def download(self, path):
+        with open(self._path(path), 'rb') as source:
+            return source.read()
+
+    def remove(self, paths):
+        removed = []
+        for path in paths:
+            try:
+                os.remove(self._path(path))
+                removed.append({'name': path})
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def get_public_url(self, path):
+        return f"{self.storage.public_url}/{self.name}/{path.lstrip('/')}"
+
+class LocalStorage:
+    def __init__(self, directory, public_url):
+        self.directory = directory
+        self.public_url = public_url.rstrip('/')
+        os.makedirs(directory, exist_ok=True)
+
+    def from_(self, bucket):
+        if not bucket or bucket in ('.', '..') or '/' in bucket or os.sep in bucket:
+            raise ValueError(f"Invalid bucket name: {bucket}")
+        return LocalBucket(self, bucket)
+
+class LocalClient:
+    """Single-machine stand-in for the Supabase client: SQLite for tables, a directory for storage.
+
+    Implements the subset of the supabase-py API that database.py uses (table
+    queries, the get_categories_with_counts RPC and bucket upload/remove/
+    get_public_url), so the data layer runs unchanged for benchmarks and load
+    tests. Public URLs point at `public_url`, which app.py serves in local mode.
+    """
+
+    def __init__(self, db_path, storage_dir, public_url):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA foreign_keys=ON')
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+        self._columns = {}
+        self.storage = LocalStorage(storage_dir, public_url)
+
+    def columns(self, table):
+        if table not in self._columns:
+            with self._lock:
+                rows = self._db.execute(f"PRAGMA table_info({table})").fetchall()
+            if not rows:
+                raise ValueError(f"Unknown table {table}")
+            self._columns[table] = {row['name'] for row in rows}
+        return self._columns[table]
+
+    def query(self, sql, params=(), write=False):
+        with self._lock:
+            try:
+                rows = [dict(row) for row in self._db.execute(sql, params).fetchall()]
+                if write:
+                    self._db.commit()
+                return rows
+            except Exception:
+                self._db.rollback()
+                raise
+
+    def table(self, name):
+        return LocalQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, name, params=None):
+        return LocalRpc(self, name, params)
+
+class AsyncStatement:
+    """A LocalQuery or LocalRpc whose execute() is awaited, like the builders of supabase's AsyncClient.
+
+    The statement itself runs on a worker thread; SQLite has no async driver.
+    """
+
+    def __init__(self, statement):
+        self._statement = statement
+
+    def __getattr__(self, name):
+        method = getattr(self._statement, name)
+
+        def call(*args, **kwargs):
+            result = method(*args, **kwargs)
+            # Builder methods return the statement, keep chaining on the wrapper
+            return self if result is self._statement else result
+        return call
+
+    async def execute(self):
+        return await asyncio.to_thread(self._statement.execute)
+
+class AsyncLocalClient:
+    """The tables and RPC of a LocalClient behind the async supabase-py API that database.py's async functions use."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def _wrap(self, statement):
+        return AsyncStatement(statement)
+
+    def table(self, name):
+        return self._wrap(LocalQuery(self.client, name))
+
+    from_ = table
+
+    def rpc(self, name, params=None):
+        return self._wrap(LocalRpc(self.client, name, params))
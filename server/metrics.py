@@ -0,0 +1,178 @@
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds in seconds, from a warm cache hit to a slow LLM call
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+def formatLabels(labels):
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for v in labels.values())
+    return ','.join(f'{k}="{v}"' for k, v in zip(labels, escaped))
+
+class Registry:
+    """Histograms keyed by metric name and label values, rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}
+        self._histograms = {}  # (name, labels tuple) -> Histogram
+
+    def histogram(self, name, help_text, **labels):
+        key = (name, tuple(labels.items()))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+                self._help.setdefault(name, help_text)
+        return histogram
+
+    def render(self, stats=None):
+        """Every histogram, plus each numeric value of `stats` ({component: {stat: value}}) as a gauge."""
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+        current = None
+        for (name, labels), histogram in histograms:
+            counts, total, count = histogram.snapshot()
+            if not count:
+                # Decorated functions register at import, only report the ones that ran
+                continue
+            if name != current:
+                lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                current = name
+            label_text = formatLabels(dict(labels))
+            prefix = label_text + ',' if label_text else ''
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f"{name}_sum{{{label_text}}} {total}")
+            lines.append(f"{name}_count{{{label_text}}} {count}")
+
+        if stats:
+            lines.append("# HELP resumevc_component_stat Counters and gauges kept by the caches and queues")
+            lines.append("# TYPE resumevc_component_stat gauge")
+            for component, values in sorted(stats.items()):
+                for stat, value in sorted(values.items()):
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        lines.append(f"resumevc_component_stat{{{formatLabels({'component': component, 'stat': stat})}}} {value}")
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+
+class RequestTiming:
+    """Time spent per phase during one request, as exclusive (self) time.
+
+    Timers nest: a storage upload inside a database call counts towards
+    `storage` only, so the phases add up to no more than the request itself.
+    Calls awaited concurrently (asyncio.gather) are each counted in full, so
+    their phase can add up to more than the wall-clock time it took.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}  # phase -> [seconds, calls]
+
+    def serverTiming(self):
+        """Value for a Server-Timing header, in milliseconds."""
+        entries = []
+        for phase, (seconds, calls) in self.phases.items():
+            entries.append(f'{phase};dur={seconds * 1e3:.2f};desc="{calls} call{"s" if calls != 1 else ""}"')
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1e3:.2f}")
+        return ', '.join(entries)
+
+_current = contextvars.ContextVar('request_timing', default=None)
+# [child seconds] of the innermost open timer. A context variable rather than a stack on the
+# request, so each task of an asyncio.gather() nests under the timer that started it.
+_parent = contextvars.ContextVar('timer_parent', default=None)
+
+def startRequest():
+    timing = RequestTiming()
+    return timing, _current.set(timing)
+
+def finishRequest(token):
+    _current.reset(token)
+
+class timer:
+    """Context manager timing one block as `phase`, labelled `op` in the histogram.
+
+    Always feeds the resumevc_phase_seconds histogram. Inside a request started
+    with startRequest() it also adds to that request's Server-Timing breakdown;
+    in worker threads (which don't inherit the request) only the histogram is fed.
+    """
+
+    def __init__(self, phase, op=None, histogram=None):
+        self.phase = phase
+        self.histogram = histogram or phaseHistogram(phase, op or phase)
+
+    def __enter__(self):
+        self._timing = _current.get()
+        if self._timing is not None:
+            self._frame = [0.0]
+            self._parent = _parent.get()
+            self._token = _parent.set(self._frame)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self._start
+        self.histogram.observe(elapsed)
+        timing = self._timing
+        if timing is not None:
+            _parent.reset(self._token)
+            totals = timing.phases.setdefault(self.phase, [0.0, 0])
+            totals[0] += max(elapsed - self._frame[0], 0.0)
+            totals[1] += 1
+            if self._parent is not None:
+                self._parent[0] += elapsed
+        return False
+
+def phaseHistogram(phase, op):
+    return registry.histogram(
+        'resumevc_phase_seconds', 'Time spent in auth, database, storage, PDF and LLM calls',
+        phase=phase, op=op
+    )
+
+def timed(phase):
+    """Decorator: time every call of the function as `phase`, labelled with its name."""
+    def decorate(fn):
+        # Looked up once here, so a call only pays for two clock reads and a lock
+        histogram = phaseHistogram(phase, fn.__name__)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def asyncWrapper(*args, **kwargs):
+                with timer(phase, histogram=histogram):
+                    return await fn(*args, **kwargs)
+            return asyncWrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(phase, histogram=histogram):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,286 @@
+import io
+import mmap
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import deque, namedtuple
+from multiprocessing.connection import wait
+
+from pypdf import PdfReader
+
+DEADLINE_GRACE = 0.5
+
+PdfText = namedtuple('PdfText', ['text', 'page_count', 'truncated'])
+
+class PdfTooLargeError(ValueError):
+    """Raised before parsing when a PDF is over the extractor's byte limit."""
+
+def extractPages(source, start, stop, deadline):
+    """Text of pages [start, stop) plus the document's page count. Runs in a worker process.
+
+    `source` is PDF bytes or the path of a PDF file, which is memory-mapped
+    rather than read. Stops early once `deadline` (time.time()) has passed, so a
+    chunk returns whatever it finished instead of nothing.
+    """
+    if isinstance(source, bytes):
+        return readPages(io.BytesIO(source), start, stop, deadline)
+    with open(source, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        return readPages(view, start, stop, deadline)
+
+def readPages(stream, start, stop, deadline):
+    reader = PdfReader(stream)
+    total = len(reader.pages)
+    texts = []
+    for index in range(start, min(stop, total)):
+        if time.time() > deadline:
+            break
+        texts.append(reader.pages[index].extract_text() or '')
+    return start, texts, total
+
+def serveWorker(conn):
+    """Worker process loop: run extractPages for each task received, until told to stop."""
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        try:
+            result = (True, extractPages(*task))
+        except Exception as e:
+            result = (False, e)
+        try:
+            conn.send(result)
+        except Exception:
+            # An exception that won't pickle
+            conn.send((False, RuntimeError(repr(result[1]))))
+
+class Worker:
+    """One extraction process and the pipe to it. Handles a single task at a time."""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=serveWorker, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join(1)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.conn.close()
+
+class PdfExtractor:
+    """pypdf text extraction in worker processes, with page, byte and time limits.
+
+    Parsing holds the GIL for the whole document, so it runs in separate
+    processes rather than on request threads. The first `chunk_pages` pages are
+    extracted together with the page count; longer documents are then split into
+    page ranges that are extracted in parallel. Pages past `max_pages`, and
+    anything not finished within `timeout` seconds, are left out and the result is
+    flagged as truncated. A single page of a hostile PDF can take arbitrarily long,
+    so the workers still running a document's chunks at its deadline are killed.
+    Each worker runs one chunk at a time and belongs to that document until it
+    returns, so other documents being extracted concurrently are never affected.
+    A chunk whose worker dies some other way is retried once on a new worker.
+    With `workers=0` everything runs inline under the same limits.
+    """
+
+    def __init__(self, workers=4, max_pages=50, max_bytes=10 * 1024 * 1024, timeout=10.0, chunk_pages=8):
+        self.workers = workers
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.chunk_pages = chunk_pages
+        # spawn: forking a threaded server process can copy held locks into the child
+        self._context = multiprocessing.get_context('spawn')
+        self._idle = []
+        self._started = 0  # idle plus busy workers
+        self._closed = False
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self.stats = {'documents': 0, 'pages': 0, 'truncated': 0, 'timeouts': 0,
+                      'workers_killed': 0, 'worker_crashes': 0}
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _checkout(self, deadline=None):
+        """An idle or new worker. Waits for one until `deadline`, or returns None at once without one."""
+        with self._available:
+            while not self._idle and self._started >= self.workers:
+                remaining = deadline - time.time() if deadline is not None else 0
+                if remaining <= 0 or self._closed:
+                    return None
+                self._available.wait(remaining)
+            if self._idle:
+                return self._idle.pop()
+            self._started += 1
+        try:
+            return Worker(self._context)
+        except Exception:
+            self._retire(None)
+            raise
+
+    def _checkin(self, worker):
+        with self._available:
+            if not self._closed:
+                self._idle.append(worker)
+                self._available.notify()
+                return
+            self._started -= 1
+        worker.stop()
+
+    def _retire(self, worker, stat=None):
+        if worker is not None:
+            worker.kill()
+        with self._available:
+            self._started -= 1
+            if stat:
+                self.stats[stat] += 1
+            self._available.notify()
+
+    def _lost(self, worker, task, queued, retried):
+        # The process died under this chunk: try it once more on a new worker
+        print(f"[PDF] Worker exited while extracting pages {task[0]}-{task[1]}", file=sys.stderr)
+        self._retire(worker, 'worker_crashes')
+        if task not in retried:
+            retried.add(task)
+            queued.append(task)
+
+    def _inline(self, source, deadline):
+        start, texts, total = extractPages(source, 0, self.max_pages, deadline)
+        return {start: texts}, total
+
+    def _pooled(self, source, deadline):
+        chunks = {}
+        total = None
+        queued = deque([(0, self.chunk_pages)])
+        retried = set()
+        running = {}  # conn -> (worker, task)
+        error = None
+        try:
+            while queued or running:
+                # Start what we can: wait for a worker only when none is running for this document,
+                # so a document never holds one worker while blocking for another
+                while queued:
+                    worker = self._checkout(None if running else deadline + DEADLINE_GRACE)
+                    if worker is None:
+                        break
+                    task = queued.popleft()
+                    try:
+                        worker.conn.send((source, task[0], task[1], deadline))
+                    except (OSError, EOFError):
+                        self._lost(worker, task, queued, retried)
+                        continue
+                    running[worker.conn] = (worker, task)
+                if not running:
+                    if queued:
+                        self._count('timeouts')
+                    break
+
+                # Workers stop at the deadline themselves; the grace lets them return what they read
+                remaining = deadline + DEADLINE_GRACE - time.time()
+                ready = wait(list(running), timeout=max(0.0, remaining))
+                if not ready:
+                    self._count('timeouts')
+                    break
+                for conn in ready:
+                    worker, task = running.pop(conn)
+                    try:
+                        ok, result = conn.recv()
+                    except (OSError, EOFError):
+                        self._lost(worker, task, queued, retried)
+                        continue
+                    self._checkin(worker)
+                    if not ok:
+                        error = error or result
+                        continue
+                    start, texts, pages = result
+                    chunks[start] = texts
+                    if total is None:
+                        total = pages
+                        limit = min(total, self.max_pages)
+                        # Every range re-reads the xref, so use no more ranges than workers
+                        size = max(self.chunk_pages, -(-(limit - self.chunk_pages) // self.workers))
+                        for chunk_start in range(self.chunk_pages, limit, size):
+                            queued.append((chunk_start, min(chunk_start + size, limit)))
+                if error is not None:
+                    break
+        finally:
+            # Anything still running belongs to this document alone; stop it
+            for worker, task in running.values():
+                self._retire(worker, 'workers_killed')
+        if error is not None:
+            raise error
+        return chunks, total
+
+    def extract(self, source):
+        """Return PdfText(text, page_count, truncated) for PDF bytes or a PDF file path.
+
+        Workers only ever get a path, which they memory-map: bytes are written to a
+        temporary file once rather than pickled into every chunk's task.
+        """
+        size = len(source) if isinstance(source, bytes) else os.path.getsize(source)
+        if size > self.max_bytes:
+            raise PdfTooLargeError(f"PDF is {size} bytes, the limit is {self.max_bytes}")
+
+        deadline = time.time() + self.timeout
+        if self.workers > 0 and isinstance(source, bytes):
+            with tempfile.NamedTemporaryFile(prefix='resumevc-', suffix='.pdf') as spill:
+                spill.write(source)
+                spill.flush()
+                chunks, total = self._pooled(spill.name, deadline)
+        elif self.workers > 0:
+            chunks, total = self._pooled(source, deadline)
+        else:
+            chunks, total = self._inline(source, deadline)
+
+        # Join once at the end rather than growing a string page by page
+        texts = [text for start in sorted(chunks) for text in chunks[start]]
+        extracted = len(texts)
+        truncated = total is None or extracted < total
+
+        with self._lock:
+            self.stats['documents'] += 1
+            self.stats['pages'] += extracted
+            if truncated:
+                self.stats['truncated'] += 1
+        return PdfText('\n'.join(text for text in texts if text).strip(), total, truncated)
+
+    def close(self):
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._started -= len(idle)
+            self._available.notify_all()
+        for worker in idle:
+            worker.stop()
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+def getPdfExtractor():
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = PdfExtractor(
+                    workers=int(os.environ.get("PDF_WORKERS") or min(4, os.cpu_count() or 1)),
+                    max_pages=int(os.environ.get("PDF_MAX_PAGES") or 50),
+                    max_bytes=int(os.environ.get("PDF_MAX_BYTES") or 10 * 1024 * 1024),
+                    timeout=float(os.environ.get("PDF_TIMEOUT") or 10),
+                    chunk_pages=int(os.environ.get("PDF_CHUNK_PAGES") or 8)
+                )
+    return _extractor
@@ -0,0 +1,57 @@
+"""Write gzip (and brotli, if the brotli package is installed) copies of the built client.
+
+Run after `vite build`; the server picks the .gz/.br files up at startup and
+serves them to clients that accept them (see staticfiles.py).
+
+    uv run python precompress.py ../client/dist
+"""
+import argparse
+import gzip
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ('.html', '.js', '.mjs', '.css', '.svg', '.json', '.txt', '.map', '.xml', '.wasm', '.ico')
+MIN_BYTES = 1024
+
+def compressors():
+    yield '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield '.br', lambda data: brotli.compress(data, quality=11)
+
+def precompress(root):
+    written = skipped = 0
+    for directory, _, names in os.walk(root):
+        for name in names:
+            if not name.endswith(COMPRESSIBLE):
+                continue
+            path = os.path.join(directory, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            if len(data) < MIN_BYTES:
+                skipped += 1
+                continue
+            for suffix, compress in compressors():
+                compressed = compress(data)
+                # Not worth a second file (and a Vary header) if it barely shrinks
+                if len(compressed) > len(data) * 0.9:
+                    continue
+                with open(path + suffix, 'wb') as f:
+                    f.write(compressed)
+                written += 1
+    print(f"Precompressed {root}: {written} files written, {skipped} too small")
+    if brotli is None:
+        print("brotli is not installed, only gzip copies were written", file=sys.stderr)
+    return written
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('root', nargs='?', default=os.path.join(os.path.dirname(__file__), '..', 'client', 'dist'))
+    args = parser.parse_args()
+    if not os.path.isdir(args.root):
+        sys.exit(f"{args.root} does not exist, build the client first")
+    precompress(args.root)
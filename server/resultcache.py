@@ -0,0 +1,97 @@
+import json
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+class ResultCache:
+    """TTL + LRU cache for JSON-serialisable results, optionally persisted to SQLite.
+
+    The in-memory tier holds at most `max_entries`. When `sqlite_path` is set,
+    every result is also written there, so cached results survive restarts and
+    are shared between worker processes on the same machine.
+    """
+
+    def __init__(self, ttl=24 * 3600, max_entries=1024, sqlite_path=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.sqlite_path = sqlite_path
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (value, expires_at, latency)
+        self._db = None
+        self._puts = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'saved_seconds': 0.0}
+
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, latency REAL NOT NULL)'
+            )
+            self._db.commit()
+
+    def _remember(self, key, value, expires_at, latency):
+        self._memory[key] = (value, expires_at, latency)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _hit(self, value, latency):
+        self.stats['hits'] += 1
+        self.stats['saved_seconds'] += latency
+        return value
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at, latency = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    return self._hit(value, latency)
+                del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        'SELECT value, expires_at, latency FROM results WHERE key = ?', (key,)
+                    ).fetchone()
+                    if row and row[1] > now:
+                        value = json.loads(row[0])
+                        self._remember(key, value, row[1], row[2])
+                        return self._hit(value, row[2])
+                except sqlite3.Error as e:
+                    print(f"[ResultCache] SQLite read failed: {e}", file=sys.stderr)
+
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, key, value, latency=0.0):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at, latency)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        'INSERT OR REPLACE INTO results (key, value, expires_at, latency) VALUES (?, ?, ?, ?)',
+                        (key, json.dumps(value), expires_at, latency)
+                    )
+                    self._puts += 1
+                    if self._puts % 256 == 0:
+                        self._db.execute('DELETE FROM results WHERE expires_at <= ?', (time.time(),))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"[ResultCache] SQLite write failed: {e}", file=sys.stderr)
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._memory)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
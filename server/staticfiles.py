@@ -0,0 +1,77 @@
+import hashlib
+import mimetypes
+import os
+from collections import namedtuple
+
+from flask import request, send_file
+
+# Preferred first; the files themselves are written at build time by precompress.py
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+# Vite puts content-hashed bundles here, so a given URL never changes
+IMMUTABLE_PREFIX = 'assets/'
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+StaticFile = namedtuple('StaticFile', ['path', 'mimetype', 'etag', 'variants', 'immutable'])
+
+def fileDigest(path):
+    digest = hashlib.blake2b(digest_size=12)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class StaticManifest:
+    """The built client, indexed once so serving a file never touches the filesystem to find it.
+
+    Each entry knows its MIME type, a content ETag and which precompressed
+    variants (name.br, name.gz) exist next to it. Hashed files under assets/
+    are served with a year-long immutable Cache-Control; everything else
+    (index.html above all) is no-cache and revalidated with its ETag.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.files = {}
+        if root and os.path.isdir(root):
+            self._scan()
+
+    def _scan(self):
+        suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(directory, name)
+                if name.endswith(suffixes) and os.path.exists(path.rsplit('.', 1)[0]):
+                    continue
+                key = os.path.relpath(path, self.root).replace(os.sep, '/')
+                etag = fileDigest(path)
+                variants = {}
+                for encoding, suffix in ENCODINGS:
+                    variant = path + suffix
+                    # A variant older than its source is left over from a previous build
+                    if os.path.exists(variant) and os.path.getmtime(variant) >= os.path.getmtime(path):
+                        variants[encoding] = (variant, f"{etag}-{encoding}")
+                mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+                self.files[key] = StaticFile(path, mimetype, etag, variants, key.startswith(IMMUTABLE_PREFIX))
+
+    def lookup(self, path):
+        return self.files.get(path)
+
+    def send(self, entry):
+        """Response for `entry` in the best encoding the current request accepts; 304 if its ETag matches."""
+        path, etag, encoding = entry.path, entry.etag, None
+        for name, _ in ENCODINGS:
+            if name in entry.variants and request.accept_encodings.quality(name) > 0:
+                (path, etag), encoding = entry.variants[name], name
+                break
+
+        response = send_file(
+            path, mimetype=entry.mimetype, etag=etag, conditional=True,
+            max_age=IMMUTABLE_MAX_AGE if entry.immutable else None
+        )
+        if entry.immutable:
+            response.cache_control.immutable = True
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if entry.variants:
+            response.vary.add('Accept-Encoding')
+        return response
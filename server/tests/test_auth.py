@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import pytest
+
+from auth import ClerkVerifier
+from bench.fakes import FakeClerk
+
+@pytest.fixture
+def clerk():
+    with FakeClerk() as server:
+        yield server
+
+def signedRequest(token):
+    return SimpleNamespace(headers={'Authorization': f"Bearer {token}"})
+
+def makeVerifier(clerk, **kwargs):
+    return ClerkVerifier('sk_test', api_url=clerk.url, **kwargs)
+
+def test_jwks_fetched_once_for_many_tokens(clerk):
+    verifier = makeVerifier(clerk)
+    for sub in ('user_a', 'user_b', 'user_c'):
+        state = verifier.authenticate(signedRequest(clerk.mintToken(sub=sub)))
+        assert state.is_signed_in
+        assert state.payload['sub'] == sub
+    assert verifier.stats['jwks_fetches'] == 1
+    assert clerk.requests == 1
+
+def test_verified_token_is_remembered(clerk):
+    verifier = makeVerifier(clerk)
+    request = signedRequest(clerk.mintToken())
+    assert verifier.authenticate(request).is_signed_in
+    assert verifier.authenticate(request).is_signed_in
+    assert verifier.stats['token_misses'] == 1
+    assert verifier.stats['token_hits'] == 1
+
+def test_unknown_kid_refetches_jwks(clerk):
+    verifier = makeVerifier(clerk, min_refresh_interval=0)
+    assert verifier.authenticate(signedRequest(clerk.mintToken())).is_signed_in
+
+    clerk.rotate()
+    state = verifier.authenticate(signedRequest(clerk.mintToken(sub='user_rotated')))
+    assert state.is_signed_in
+    assert state.payload['sub'] == 'user_rotated'
+    assert verifier.stats['jwks_fetches'] == 2
+
+def test_unknown_kid_refetch_is_rate_limited(clerk):
+    verifier = makeVerifier(clerk, min_refresh_interval=60)
+    assert verifier.authenticate(signedRequest(clerk.mintToken())).is_signed_in
+
+    clerk.rotate()
+    for _ in range(3):
+        assert not verifier.authenticate(signedRequest(clerk.mintToken())).is_signed_in
+    assert verifier.stats['jwks_fetches'] == 1
+
+def test_stale_jwks_is_refetched(clerk):
+    verifier = makeVerifier(clerk, jwks_ttl=0)
+    for _ in range(2):
+        assert verifier.authenticate(signedRequest(clerk.mintToken())).is_signed_in
+    assert verifier.stats['jwks_fetches'] == 2
+
+def test_bad_signature_is_rejected(clerk):
+    verifier = makeVerifier(clerk)
+    token = clerk.mintToken()
+    header, payload, signature = token.split('.')
+    forged = f"{header}.{payload}.{signature[::-1]}"
+    assert not verifier.authenticate(signedRequest(forged)).is_signed_in
+    assert verifier.stats['token_hits'] == 0
@@ -0,0 +1,72 @@
+import time
+
+import openai
+import pytest
+
+from bench.fakes import FakeLLM
+from llmclient import CircuitBreaker, CircuitOpenError, LLMClient
+
+MESSAGES = [{'role': 'user', 'content': 'hello'}]
+
+@pytest.fixture
+def llm():
+    with FakeLLM() as server:
+        yield server
+
+def makeClient(llm, reset_timeout=30.0):
+    return LLMClient('test', base_url=llm.url + '/v1/', max_retries=0,
+                     breaker=CircuitBreaker(failure_threshold=2, reset_timeout=reset_timeout))
+
+def test_breaker_opens_after_consecutive_failures(llm):
+    client = makeClient(llm)
+    llm.failNext(2, status=503)
+    for _ in range(2):
+        with pytest.raises(openai.InternalServerError):
+            client.chat('fake', MESSAGES)
+    assert client.breaker.state == 'open'
+
+    with pytest.raises(CircuitOpenError):
+        client.chat('fake', MESSAGES)
+    assert llm.requests == 2
+    assert client.stats['short_circuited'] == 1
+
+def test_non_retryable_error_does_not_close_breaker(llm):
+    client = makeClient(llm, reset_timeout=0.05)
+    llm.failNext(2, status=503)
+    for _ in range(2):
+        with pytest.raises(openai.InternalServerError):
+            client.chat('fake', MESSAGES)
+    time.sleep(0.1)
+
+    # The half-open trial gets a 400: that says nothing about the upstream, so the breaker stays half-open
+    llm.failNext(1, status=400)
+    with pytest.raises(openai.BadRequestError):
+        client.chat('fake', MESSAGES)
+    assert client.breaker.state == 'half-open'
+
+    # ...and lets the next call be the trial, which closes it
+    assert client.chat('fake', MESSAGES).choices[0].message.content
+    assert client.breaker.state == 'closed'
+
+def test_non_retryable_error_does_not_reset_failure_count(llm):
+    client = makeClient(llm)
+    llm.failNext(1, status=503)
+    with pytest.raises(openai.InternalServerError):
+        client.chat('fake', MESSAGES)
+
+    llm.failNext(1, status=400)
+    with pytest.raises(openai.BadRequestError):
+        client.chat('fake', MESSAGES)
+    assert client.breaker.state == 'closed'
+
+    llm.failNext(1, status=503)
+    with pytest.raises(openai.InternalServerError):
+        client.chat('fake', MESSAGES)
+    assert client.breaker.state == 'open'
+
+def test_retryable_errors_are_retried(llm):
+    client = LLMClient('test', base_url=llm.url + '/v1/', max_retries=2, backoff_base=0.01)
+    llm.failNext(2, status=503)
+    assert client.chat('fake', MESSAGES).choices[0].message.content
+    assert client.stats['retries'] == 2
+    assert client.breaker.state == 'closed'
@@ -0,0 +1,140 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+class TextCache:
+    """Two-tier cache for extracted resume text.
+
+    Entries live in a size-bounded in-memory LRU backed by one file per key in
+    `directory`, which is also size-bounded (oldest files go first). Keys are
+    content hashes; `aliases` (e.g. a hash of the storage URL) point at a key so
+    a lookup can skip the download as well as the parse.
+    """
+
+    def __init__(self, directory=None, max_memory_bytes=32 * 1024 * 1024, max_disk_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> text
+        self._memory_bytes = 0
+        self._aliases = {}  # alias -> key
+        self._disk_bytes = 0
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'memory_evictions': 0, 'disk_evictions': 0}
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._disk_bytes = sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.is_file())
+
+    def _path(self, key, suffix='.txt'):
+        return os.path.join(self.directory, key + suffix)
+
+    def _remember(self, key, text):
+        size = len(text.encode('utf-8'))
+        if size > self.max_memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key).encode('utf-8'))
+        self._memory[key] = text
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted.encode('utf-8'))
+            self.stats['memory_evictions'] += 1
+
+    def _resolve(self, key):
+        if key in self._aliases:
+            return self._aliases[key]
+        if self.directory:
+            try:
+                with open(self._path(key, '.ref'), encoding='utf-8') as f:
+                    target = f.read().strip()
+                self._aliases[key] = target
+                return target
+            except FileNotFoundError:
+                pass
+        return key
+
+    def get(self, key):
+        with self._lock:
+            key = self._resolve(key)
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return self._memory[key]
+
+            if self.directory:
+                path = self._path(key)
+                try:
+                    with open(path, encoding='utf-8') as f:
+                        text = f.read()
+                    os.utime(path)  # Mark as recently used for disk eviction
+                    self._remember(key, text)
+                    self.stats['disk_hits'] += 1
+                    return text
+                except FileNotFoundError:
+                    pass
+
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, key, text, aliases=()):
+        with self._lock:
+            self._remember(key, text)
+            for alias in aliases:
+                self._aliases[alias] = key
+
+            if not self.directory:
+                return
+            try:
+                self._write(self._path(key), text)
+                for alias in aliases:
+                    self._write(self._path(alias, '.ref'), key)
+                self._evictDisk()
+            except OSError as e:
+                print(f"[TextCache] Could not write to disk: {e}", file=sys.stderr)
+
+    def delete(self, key):
+        with self._lock:
+            key = self._resolve(key)
+            if key in self._memory:
+                self._memory_bytes -= len(self._memory.pop(key).encode('utf-8'))
+            if self.directory:
+                try:
+                    path = self._path(key)
+                    self._disk_bytes -= os.path.getsize(path)
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _write(self, path, text):
+        data = text.encode('utf-8')
+        if os.path.exists(path):
+            self._disk_bytes -= os.path.getsize(path)
+        # Write then rename so a concurrent reader never sees a half-written file
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._disk_bytes += len(data)
+
+    def _evictDisk(self):
+        if self._disk_bytes <= self.max_disk_bytes:
+            return
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.is_file()),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in entries:
+            if self._disk_bytes <= self.max_disk_bytes:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            self._disk_bytes -= size
+            self.stats['disk_evictions'] += 1
+        # Aliases may now point at evicted entries; they simply miss on lookup
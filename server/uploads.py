@@ -0,0 +1,74 @@
+import hashlib
+import io
+import os
+from tempfile import SpooledTemporaryFile
+
+from flask import Request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES") or 10 * 1024 * 1024)
+# Uploads up to this size stay in memory, larger ones spill to an anonymous temp file
+SPOOL_BYTES = 1024 * 1024
+PDF_MAGIC = b'%PDF-'
+
+class PdfUploadStream(io.RawIOBase):
+    """Sink for an uploaded file part that inspects the bytes as they are parsed.
+
+    Werkzeug writes each chunk of the multipart body here exactly once. Along the
+    way we hash it, enforce `max_bytes` and check the PDF magic bytes, so the
+    route never needs a second pass (or a copy on disk) to validate the upload.
+    """
+
+    def __init__(self, max_bytes=MAX_UPLOAD_BYTES, spool_bytes=SPOOL_BYTES):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._head = b''
+        self._spool = SpooledTemporaryFile(max_size=spool_bytes, mode='w+b')
+
+    @property
+    def sha256(self):
+        return self._hash.hexdigest()
+
+    @property
+    def is_pdf(self):
+        return self._head.startswith(PDF_MAGIC)
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def write(self, b):
+        self.size += len(b)
+        if self.size > self.max_bytes:
+            raise RequestEntityTooLarge(f"Uploaded file is larger than {self.max_bytes} bytes")
+        if len(self._head) < len(PDF_MAGIC):
+            self._head += bytes(b[:len(PDF_MAGIC) - len(self._head)])
+        self._hash.update(b)
+        return self._spool.write(b)
+
+    def readinto(self, b):
+        return self._spool.readinto(b)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._spool.seek(offset, whence)
+
+    def tell(self):
+        return self._spool.tell()
+
+    def close(self):
+        if not self.closed:
+            self._spool.close()
+        super().close()
+
+class UploadRequest(Request):
+    """Request class that parses file uploads straight into a PdfUploadStream."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return PdfUploadStream()
@@ -0,0 +1,66 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+class UserCache:
+    """Per-user read-through cache with TTL, an LRU bound on users and exact invalidation.
+
+    Every user has a generation number that invalidate() bumps. Reads note the
+    generation before querying and put() drops the result if a write happened in
+    the meantime, so a slow read can never re-cache data from before a write.
+    Values are deep-copied in and out, so callers can mutate what they get back.
+
+    Generations live in this process only: a write served by another process
+    isn't seen here, and reads may be stale for up to `ttl` seconds. The server
+    runs as a single process; anything that runs several must set ttl to 0,
+    which turns the cache off.
+    """
+
+    def __init__(self, ttl=30.0, max_users=1024):
+        self.ttl = ttl
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # user_id -> {key: (value, expires_at)}
+        self._generations = {}  # user_id -> int
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'evictions': 0}
+
+    def generation(self, user_id):
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def get(self, user_id, key):
+        with self._lock:
+            entry = self._entries.get(user_id, {}).get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.stats['hits'] += 1
+                return copy.deepcopy(entry[0])
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, user_id, key, value, generation):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if self._generations.get(user_id, 0) != generation:
+                return
+            self._entries.setdefault(user_id, {})[key] = (copy.deepcopy(value), time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                # Generations are kept so an in-flight read for the evicted user still can't go stale
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self.stats['invalidations'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats, users=len(self._entries))
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        return stats